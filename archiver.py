@@ -5,9 +5,16 @@ Immediately captures article content when URL is detected.
 """
 
 import asyncio
+import concurrent.futures
+import hashlib
+import logging
+import random
+import re
 import aiohttp
-from datetime import datetime
-from typing import Optional, Callable, List
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from typing import Optional, Callable, List, Dict, Tuple
 from dataclasses import dataclass
 
 from config import get_config
@@ -15,6 +22,38 @@ from storage import get_storage, Article, STATUS_NEW
 from parser import ArticleParser
 from scanner import ArticleLink
 
+logger = logging.getLogger(__name__)
+
+# Tags, digits and whitespace differ between republished copies of one story
+_NORMALIZE_RE = re.compile(r'<[^>]+>|\d+|\s+')
+_DIGEST_MIN_TEXT = 200  # shorter bodies are too generic to call duplicates
+
+# SQLite and BeautifulSoup calls block; they run here so the event loop
+# keeps serving the other in-flight fetches meanwhile.
+_WORK_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix="archiver")
+
+
+def _content_digest(article: Article) -> Optional[bytes]:
+    """Digest of the normalized body text, or None if there is too little text."""
+    text = _NORMALIZE_RE.sub('', article.content_text or '')
+    if len(text) < _DIGEST_MIN_TEXT:
+        return None
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest()
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
 
 class AutoArchiver:
     """
@@ -24,10 +63,16 @@ class AutoArchiver:
     1. Receive URL from Scanner
     2. Check if already seen (dedup)
     3. IMMEDIATELY fetch HTML content
-    4. Parse and save to DB with status=NEW
+    4. Parse, drop republished duplicates, save to DB with status=NEW
     5. Notify UI via callback
     """
     
+    CONTENT_DIGEST_CACHE = 50_000  # recent bodies remembered for dedup
+    IMAGE_CONCURRENCY = 20  # image fetches in flight across all articles
+    SAVE_BATCH = 64  # articles per DB commit
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    RETRY_MAX_DELAY = 30.0  # seconds; also caps a server's Retry-After
+    
     def __init__(self, on_captured: Optional[Callable[[Article], None]] = None):
         """
         Args:
@@ -38,37 +83,109 @@ class AutoArchiver:
         self.parser = ArticleParser()
         self.on_captured = on_captured
         
+        # source name -> parser site_code, resolved once instead of per article
+        self._site_codes: Dict[str, str] = {s.name: s.site_code for s in self.config.sources}
+        
         self._session: Optional[aiohttp.ClientSession] = None
-        self._stats = {
-            'captured': 0,
-            'skipped': 0,
-            'failed': 0
-        }
+        self._content_digests: Dict[bytes, None] = {}  # insertion-ordered set
+        self._image_semaphore = asyncio.Semaphore(self.IMAGE_CONCURRENCY)
+        # Every request (page, image, HEAD) holds one of these while in flight;
+        # retry backoff and parsing happen outside it
+        self._fetch_semaphore = asyncio.Semaphore(self.config.worker.max_inflight)
+        
+        # Captures hand finished articles to one writer task that commits in batches
+        self._save_queue: Optional[asyncio.Queue] = None
+        self._save_task: Optional[asyncio.Task] = None
+        # Counters (plain int attributes: bumped once or more per article)
+        self._captured = 0
+        self._skipped = 0
+        self._failed = 0
     
-    async def _get_session(self) -> aiohttp.ClientSession:
+    async def __aenter__(self) -> "AutoArchiver":
+        await self.open()
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self.close()
+    
+    async def open(self):
+        """Create the shared session up front so concurrent captures reuse one pool."""
+        # Build the seen-URL Bloom filter off the loop; later checks are in-memory
+        await self._run(self.storage.warm_seen_filter)
+        
+        self._ensure_writer()
+        
         if self._session is None or self._session.closed:
             timeout = aiohttp.ClientTimeout(total=10, connect=5)
             
+            # Keep-alive pool + DNS cache: article fetches hit the same few hosts
+            worker = self.config.worker
+            connector = aiohttp.TCPConnector(
+                limit=worker.limit or self.config.system.num_workers * 4,
+                limit_per_host=worker.limit_per_host,
+                ttl_dns_cache=300,
+                use_dns_cache=True,
+                keepalive_timeout=60
+            )
+            
             # Get proxy if configured
             proxy = self.config.get_proxy()
             
             self._session = aiohttp.ClientSession(
+                connector=connector,
                 timeout=timeout,
                 headers=self.config.headers
             )
             
             # Store proxy for use in requests
             self._proxy = proxy
-        return self._session
+    
+    def _ensure_writer(self):
+        """Start the batch writer task unless it is already running."""
+        if self._save_task is None or self._save_task.done():
+            self._save_queue = asyncio.Queue(maxsize=256)
+            self._save_task = asyncio.create_task(self._save_writer())
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        session = self._session
+        if session is None or session.closed:
+            await self.open()
+            session = self._session
+        return session
     
     def _get_proxy_url(self) -> Optional[str]:
         """Get current proxy URL for request."""
         return getattr(self, '_proxy', None) or self.config.get_proxy()
     
     async def close(self):
+        queue = self._save_queue
+        if self._save_task and not self._save_task.done():
+            await queue.put(None)  # flush what is queued, then stop
+            await self._save_task
+        
+        # Saves queued behind the sentinel have no writer left: fail them
+        # instead of leaving their callers waiting forever
+        while queue is not None:
+            while not queue.empty():
+                item = queue.get_nowait()
+                if item is not None and not item[1].done():
+                    item[1].set_result(False)
+            await asyncio.sleep(0)  # let put()s blocked on a full queue land
+            if queue.empty():
+                break
+        
         if self._session and not self._session.closed:
             await self._session.close()
     
+    @staticmethod
+    async def _run(func, *args):
+        """Run a blocking storage/parser call on _WORK_POOL."""
+        return await asyncio.get_running_loop().run_in_executor(_WORK_POOL, func, *args)
+    
+    async def filter_new_urls(self, urls: List[str]) -> List[str]:
+        """URLs not seen yet; the SQL join (and any Bloom rebuild) runs off the loop."""
+        return await self._run(self.storage.filter_new_urls, urls)
+    
     async def capture(self, link: ArticleLink, source_name: str) -> Optional[Article]:
         """
         Capture a single article immediately.
@@ -80,52 +197,33 @@ class AutoArchiver:
         Returns:
             Article if captured, None if skipped/failed
         """
-        # 1. Check if already seen
-        if self.storage.is_seen(link.url):
-            self._stats['skipped'] += 1
+        # 1. Check if already seen (SQL only confirms a Bloom hit). While the
+        # filter is missing or being rebuilt, is_seen builds it off the loop.
+        storage = self.storage
+        if (
+            (not storage.seen_filter_ready() or storage.is_probably_seen(link.url))
+            and await self._run(storage.is_seen, link.url)
+        ):
+            self._skipped += 1
             return None
         
         # 2. IMMEDIATELY fetch content
-        session = await self._get_session()
-        proxy = self._get_proxy_url()  # May be None if not configured
-        
-        try:
-            async with session.get(link.url, proxy=proxy) as resp:
-                # Handle rate limiting (CRITICAL for anti-ban)
-                if resp.status == 429 or resp.status == 403:
-                    print(f"[Archiver] ⚠️ RATE LIMITED ({resp.status}): {link.url[:40]}")
-                    self._stats['failed'] += 1
-                    # Add source to cooldown (caller should handle)
-                    return None
-                
-                if resp.status != 200:
-                    print(f"[Archiver] HTTP {resp.status}: {link.url[:50]}")
-                    self._stats['failed'] += 1
-                    return None
-                
-                html = await resp.text()
-        
-        except asyncio.TimeoutError:
-            print(f"[Archiver] Timeout: {link.url[:50]}")
-            self._stats['failed'] += 1
-            return None
-        except Exception as e:
-            print(f"[Archiver] Fetch error: {e}")
-            self._stats['failed'] += 1
+        fetched = await self._fetch_html(link.url)
+        if fetched is None:
+            self._failed += 1
             return None
+        body, charset = fetched
         
         # 3. Parse content
-        # Find site_code from config
-        source_config = next((s for s in self.config.sources if s.name == source_name), None)
-        site_code = source_config.site_code if source_config else "TNO"
+        site_code = self._site_codes.get(source_name, "TNO")
 
         try:
             # Parse returns an Article object directly (or None)
-            article = self.parser.parse(html, link.url, source_name, site_code)
+            article = await self._run(self.parser.parse, body, link.url, source_name, site_code, charset)
             
             if not article:
                 # Parser failed to extract essential data (like title)
-                self._stats['skipped'] += 1
+                self._skipped += 1
                 return None
                 
             # Update ID if link had strictly better one or ensure it's set
@@ -136,14 +234,24 @@ class AutoArchiver:
             article.link_alive = True
             
         except Exception as e:
-            print(f"[Archiver] Parse error: {e}")
-            self._stats['failed'] += 1
+            logger.error("[Archiver] Parse error: %s", e)
+            self._failed += 1
             return None
         
+        # 4. Same story under another URL: remember the URL, skip the rest
+        digest = _content_digest(article)
+        if digest is not None:
+            if digest in self._content_digests:
+                await self._run(self.storage.mark_seen, link.url, article.id, source_name)
+                self._skipped += 1
+                return None
+            # Claim it now, so a copy being captured concurrently is skipped too
+            self._remember_digest(digest)
+        
         # 5. Save to DB
-        if self.storage.save_article(article):
-            self._stats['captured'] += 1
-            print(f"[Archiver] ✓ {article.title[:40]}...")
+        if await self._save(article):
+            self._captured += 1
+            logger.info("[Archiver] ✓ %.40s...", article.title)
             
             # 5b. Download images physically (async background)
             asyncio.create_task(self._download_images(article))
@@ -154,10 +262,100 @@ class AutoArchiver:
             
             return article
         
+        if digest is not None:
+            self._content_digests.pop(digest, None)  # let a later copy retry
+        return None
+    
+    async def _fetch_html(self, url: str) -> Optional[Tuple[bytes, Optional[str]]]:
+        """
+        GET an article page as (raw body, header charset); decoding is left
+        to the parser thread instead of a str copy made on the event loop.
+        
+        429/5xx and network errors are retried in place (up to
+        worker.max_retries) with exponential backoff plus jitter, or the
+        server's Retry-After when it sends one.
+        """
+        session = await self._get_session()
+        proxy = self._get_proxy_url()  # May be None if not configured
+        retries = self.config.worker.max_retries
+        
+        for attempt in range(retries + 1):
+            last = attempt == retries
+            delay = None
+            try:
+                async with self._fetch_semaphore, session.get(url, proxy=proxy) as resp:
+                    if resp.status == 200:
+                        return await resp.read(), resp.charset
+                    
+                    if resp.status in self.RETRY_STATUSES and not last:
+                        delay = _retry_after(resp.headers.get('Retry-After'))
+                        logger.warning("[Archiver] HTTP %s, retry %d/%d: %.50s", resp.status, attempt + 1, retries, url)
+                    # Handle rate limiting (CRITICAL for anti-ban)
+                    elif resp.status == 429 or resp.status == 403:
+                        logger.warning("[Archiver] ⚠️ RATE LIMITED (%s): %.40s", resp.status, url)
+                        return None
+                    else:
+                        logger.warning("[Archiver] HTTP %s: %.50s", resp.status, url)
+                        return None
+            
+            except asyncio.TimeoutError:
+                if last:
+                    logger.warning("[Archiver] Timeout: %.50s", url)
+                    return None
+            except aiohttp.ClientError as e:
+                if last:
+                    logger.error("[Archiver] Fetch error: %s", e)
+                    return None
+            except Exception as e:
+                logger.error("[Archiver] Fetch error: %s", e)
+                return None
+            
+            if delay is None:
+                delay = 2 ** attempt + random.random() * 0.5
+            await asyncio.sleep(min(delay, self.RETRY_MAX_DELAY))
+        
         return None
     
+    async def _save(self, article: Article) -> bool:
+        """Queue an article for the batch writer and wait for its commit."""
+        self._ensure_writer()
+        done = asyncio.get_running_loop().create_future()
+        await self._save_queue.put((article, done))
+        return await done
+    
+    async def _save_writer(self):
+        """Drain the save queue: one transaction per batch of finished captures."""
+        queue = self._save_queue
+        stopping = False
+        while not stopping:
+            item = await queue.get()
+            if item is None:
+                return
+            batch = [item]
+            while len(batch) < self.SAVE_BATCH and not queue.empty():
+                item = queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            try:
+                results = await self._run(self.storage.save_articles_bulk, [a for a, _ in batch])
+            except Exception as e:
+                logger.error("[Archiver] Save error: %s", e)
+                results = [False] * len(batch)
+            for (_, done), ok in zip(batch, results):
+                if not done.done():
+                    done.set_result(ok)
+    
+    def _remember_digest(self, digest: bytes):
+        digests = self._content_digests
+        digests[digest] = None
+        if len(digests) > self.CONTENT_DIGEST_CACHE:
+            del digests[next(iter(digests))]  # evict the oldest
+    
     async def _download_images(self, article: Article):
-        """Download article images to local storage."""
+        """Download article images to local storage (concurrently)."""
         if not article.images:
             return
         
@@ -168,12 +366,22 @@ class AutoArchiver:
         img_dir.mkdir(parents=True, exist_ok=True)
         
         session = await self._get_session()
+        results = await asyncio.gather(*(
+            self._download_image(session, img_url, img_dir / str(i))
+            for i, img_url in enumerate(article.images[:10])  # Max 10 images
+        ))
+        saved = [r for r in results if r is not None]
         
-        for i, img_url in enumerate(article.images[:10]):  # Max 10 images
+        # Update DB with local paths (one commit for the whole article)
+        await self._run(self.storage.save_images_bulk, article.id, saved)
+    
+    async def _download_image(self, session: aiohttp.ClientSession, img_url: str, stem) -> Optional[tuple]:
+        """Fetch one image to `stem`.<ext>; returns (url, local_path) or None."""
+        async with self._image_semaphore:
             try:
-                async with session.get(img_url) as resp:
+                async with self._fetch_semaphore, session.get(img_url) as resp:
                     if resp.status != 200:
-                        continue
+                        return None
                     
                     # Determine extension from content-type
                     content_type = resp.headers.get('content-type', '')
@@ -185,18 +393,17 @@ class AutoArchiver:
                     elif 'webp' in content_type:
                         ext = 'webp'
                     
-                    # Save image
-                    img_path = img_dir / f"{i}.{ext}"
                     content = await resp.read()
-                    
-                    with open(img_path, 'wb') as f:
-                        f.write(content)
-                    
-                    # Update DB with local path
-                    image_id = self.storage.save_image(article.id, img_url, str(img_path))
-                    
+                
+                # Save image (the fetch slot is already released)
+                img_path = stem.with_name(f"{stem.name}.{ext}")
+                await self._run(img_path.write_bytes, content)
+                
+                return (img_url, str(img_path))
+                
             except Exception as e:
-                print(f"[Archiver] Image download failed: {e}")
+                logger.warning("[Archiver] Image download failed: %s", e)
+                return None
     
     async def capture_batch(self, links: List[ArticleLink], source_name: str) -> List[Article]:
         """
@@ -210,38 +417,59 @@ class AutoArchiver:
             List of captured Articles
         """
         # Filter already-seen URLs first
-        new_urls = self.storage.filter_new_urls([l.url for l in links])
+        new_urls = set(await self.filter_new_urls([l.url for l in links]))
         new_links = [l for l in links if l.url in new_urls]
         
         if not new_links:
             return []
         
-        print(f"[Archiver] Capturing {len(new_links)} new articles from {source_name}...")
+        logger.info("[Archiver] Capturing %d new articles from %s...", len(new_links), source_name)
         
-        # Capture concurrently (with limit)
-        semaphore = asyncio.Semaphore(5)  # Max 5 concurrent fetches
+        results = await self.capture_many(new_links, source_name)
+        return [a for a in results if a is not None]
+    
+    async def capture_many(self, links: List[ArticleLink], source_name: str,
+                           concurrency: int = 5) -> List[Optional[Article]]:
+        """
+        Capture links with at most `concurrency` in flight per host (results
+        in link order).
         
-        async def capture_with_limit(link):
-            async with semaphore:
-                return await self.capture(link, source_name)
+        Links are grouped by host and each group gets its own small worker
+        set pulling from one shared iterator: consecutive fetches of a worker
+        reuse the same keep-alive connection, a slow site does not hold up
+        the others, and each link costs a loop step instead of its own task
+        parked on a semaphore.
+        """
+        results: List[Optional[Article]] = [None] * len(links)
+        by_host: Dict[str, List[Tuple[int, ArticleLink]]] = {}
+        for i, link in enumerate(links):
+            by_host.setdefault(urlsplit(link.url).netloc, []).append((i, link))
         
-        tasks = [capture_with_limit(link) for link in new_links]
-        results = await asyncio.gather(*tasks)
+        async def worker(pending):
+            for i, link in pending:
+                try:
+                    results[i] = await self.capture(link, source_name)
+                except Exception as e:
+                    logger.exception("[Archiver] Capture error: %s", e)
         
-        return [a for a in results if a is not None]
+        workers = []
+        for group in by_host.values():
+            pending = iter(group)
+            workers += [worker(pending) for _ in range(min(concurrency, len(group)))]
+        await asyncio.gather(*workers)
+        return results
     
     async def check_link_alive(self, url: str) -> bool:
         """Check if original link is still alive."""
         session = await self._get_session()
         
         try:
-            async with session.head(url, allow_redirects=True) as resp:
+            async with self._fetch_semaphore, session.head(url, allow_redirects=True) as resp:
                 alive = resp.status == 200
-                self.storage.update_link_status(url, alive)
-                return alive
         except:
-            self.storage.update_link_status(url, False)
-            return False
+            alive = False
+        await self._run(self.storage.update_link_status, url, alive)
+        return alive
     
     async def check_all_links(self, limit: int = 50):
         """Check link status for recent articles."""
@@ -250,15 +478,21 @@ class AutoArchiver:
         for article in articles:
             alive = await self.check_link_alive(article.url)
             if not alive:
-                print(f"[Archiver] 🔴 Link dead: {article.title[:30]}...")
+                logger.info("[Archiver] 🔴 Link dead: %.30s...", article.title)
     
     def get_stats(self) -> dict:
-        return self._stats.copy()
+        return {
+            'captured': self._captured,
+            'skipped': self._skipped,
+            'failed': self._failed
+        }
 
 
 # === CLI Test ===
 if __name__ == "__main__":
-    from scanner import Scanner
+    from scanner import Scanner, close_shared_session
+    
+    logging.basicConfig(level=get_config().system.log_level, format="%(message)s")
     
     async def test():
         config = get_config()
@@ -274,7 +508,7 @@ if __name__ == "__main__":
         # Scan
         scanner = Scanner(source)
         links = await scanner.scan()
-        await scanner.close()
+        await close_shared_session()
         
         print(f"Found {len(links)} links")
         
@@ -282,9 +516,8 @@ if __name__ == "__main__":
         def on_captured(article):
             print(f"  → Captured: {article.title[:50]}")
         
-        archiver = AutoArchiver(on_captured=on_captured)
-        articles = await archiver.capture_batch(links[:5], source.name)
-        await archiver.close()
+        async with AutoArchiver(on_captured=on_captured) as archiver:
+            articles = await archiver.capture_batch(links.subset(links.urls[:5]), source.name)
         
         print(f"\nCaptured {len(articles)} articles")
         print(f"Stats: {archiver.get_stats()}")
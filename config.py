@@ -43,6 +43,9 @@ class WorkerConfig:
     timeout: int = 5
     max_retries: int = 3
     priority_newest: bool = True
+    limit: int = 0  # Total connections; 0 = num_workers * 4
+    limit_per_host: int = 8
+    max_inflight: int = 32  # Requests in flight per archiver
 
 
 @dataclass  
@@ -241,7 +244,10 @@ def load_config(config_path: Optional[str] = None) -> Config:
     worker = WorkerConfig(
         timeout=worker_data.get('timeout', 5),
         max_retries=worker_data.get('max_retries', 3),
-        priority_newest=worker_data.get('priority_newest', True)
+        priority_newest=worker_data.get('priority_newest', True),
+        limit=worker_data.get('limit', 0),
+        limit_per_host=worker_data.get('limit_per_host', 8),
+        max_inflight=worker_data.get('max_inflight', 32)
     )
     
     # Parse alerting
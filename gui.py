@@ -20,7 +20,7 @@ from PyQt6.QtGui import QColor, QTextCursor, QIcon
 
 from config import get_config
 from storage import get_storage, Article, STATUS_NEW, STATUS_PICKED, STATUS_ARCHIVED
-from main import FlashNewsHunter
+from main import FlashNewsHunter, new_event_loop, setup_logging
 
 
 # === Dark Theme ===
@@ -132,7 +132,7 @@ class HunterThread(QThread):
         self._loop = None
     
     def run(self):
-        self._loop = asyncio.new_event_loop()
+        self._loop = new_event_loop()
         asyncio.set_event_loop(self._loop)
         
         self.hunter = FlashNewsHunter(
@@ -403,7 +403,7 @@ class StreamPanel(QWidget):
         self.seen_ids.clear()
         
         # Get history (limit 500)
-        articles = self.storage.get_stream(500)
+        articles = self.storage.get_stream_summary(500)
         filtered = [a for a in articles if self._matches_filter(a)]
         
         # Add to table (bottom append)
@@ -497,10 +497,7 @@ class StreamPanel(QWidget):
         if not rows:
             return
             
-        for index in rows:
-            article_id = self.table.item(index.row(), 5).text()
-            self.storage.pick_article(article_id)
-            
+        self.storage.pick_articles([self.table.item(index.row(), 5).text() for index in rows])
         self._refresh()
     
     def _on_double_click(self, index):
@@ -613,7 +610,7 @@ class ReadingBoxPanel(QWidget):
         layout.addWidget(splitter)
     
     def _refresh(self):
-        articles = self.storage.get_picked()
+        articles = self.storage.get_picked_summary()
         self.table.setRowCount(0)
         
         for article in articles:
@@ -767,7 +764,7 @@ class ArchivePanel(QWidget):
         layout.addWidget(splitter)
     
     def _refresh(self):
-        articles = self.storage.get_archived()
+        articles = self.storage.get_archived_summary()
         self._populate(articles)
     
     def _search(self):
@@ -775,7 +772,7 @@ class ArchivePanel(QWidget):
         if keyword:
             articles = [a for a in self.storage.search_articles(keyword) if a.status == STATUS_ARCHIVED]
         else:
-            articles = self.storage.get_archived()
+            articles = self.storage.get_archived_summary()
         self._populate(articles)
     
     def _populate(self, articles):
@@ -942,6 +939,7 @@ class MainWindow(QMainWindow):
 
 
 def main():
+    setup_logging()
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
     window = MainWindow()
@@ -963,11 +961,11 @@ class DeepScanWorker(QThread):
         
     def run(self):
         # Create a temporary scanner just for this task
-        from scanner import Scanner
+        from scanner import Scanner, close_shared_session
         scanner = Scanner(self.source_config)
         
         # Create new event loop for this thread
-        loop = asyncio.new_event_loop()
+        loop = new_event_loop()
         asyncio.set_event_loop(loop)
         
         try:
@@ -991,6 +989,13 @@ class DeepScanWorker(QThread):
             from config import get_config
             
             archiver = AutoArchiver()
+            loop.run_until_complete(archiver.open())
+            
+            # Drop already-archived URLs before the loop, not one capture at a time
+            new_urls = set(loop.run_until_complete(
+                archiver.filter_new_urls([l.url for l in links])
+            ))
+            links = [l for l in links if l.url in new_urls]
             
             for link in links:
                 if not self._is_running: break
@@ -1015,7 +1020,7 @@ class DeepScanWorker(QThread):
             self.finished.emit(0)
             
         finally:
-            loop.run_until_complete(scanner.close())
+            loop.run_until_complete(close_shared_session())
             loop.close()
 
     def stop(self):
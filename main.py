@@ -6,15 +6,49 @@ Core principle: "Capture First, Review Later"
 """
 
 import asyncio
+import atexit
+import logging
+import logging.handlers
+import queue
 import signal
 from datetime import datetime
 from typing import Optional, Callable, List, Dict
 
 from config import get_config, SourceConfig
 from storage import get_storage, Article
-from scanner import Scanner, ArticleLink
+from scanner import Scanner, ArticleLink, close_shared_session
 from archiver import AutoArchiver
 
+# Optional faster event loop: uvloop (or its Windows port, winloop)
+try:
+    import uvloop
+except ImportError:
+    try:
+        import winloop as uvloop
+    except ImportError:
+        uvloop = None
+
+
+def setup_logging():
+    """
+    Log through a queue: callers only enqueue records, and a listener
+    thread does the (possibly blocking) console writes.
+    """
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+    logging.basicConfig(
+        level=get_config().system.log_level,
+        format="%(message)s",
+        handlers=[logging.handlers.QueueHandler(log_queue)]
+    )
+    listener.start()
+    atexit.register(listener.stop)  # flush what is still queued
+
+
+def new_event_loop() -> asyncio.AbstractEventLoop:
+    """New event loop for a worker thread, uvloop-backed when installed."""
+    return uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
+
 
 class FlashNewsHunter:
     """
@@ -46,6 +80,7 @@ class FlashNewsHunter:
         self.on_log = on_log
         
         self._running = False
+        self._stop_event: Optional[asyncio.Event] = None  # wakes the idle wait on stop()
         self._scanners: Dict[str, Scanner] = {}
         self._archiver: Optional[AutoArchiver] = None
         self._stats = {
@@ -63,6 +98,7 @@ class FlashNewsHunter:
     async def start(self):
         """Start the capture loop."""
         self._running = True
+        self._stop_event = asyncio.Event()
         
         sources = self.config.get_enabled_sources()
         if not sources:
@@ -77,6 +113,7 @@ class FlashNewsHunter:
         
         # Initialize archiver with callback
         self._archiver = AutoArchiver(on_captured=self.on_article)
+        await self._archiver.open()
         
         # Auto cleanup on start if enabled
         if self.config.cleanup.run_on_start:
@@ -100,20 +137,22 @@ class FlashNewsHunter:
                 jitter = random.uniform(0.5, 2.0)  # Random 0.5-2s extra
                 sleep_time = self.poll_interval + jitter
                 
-                for _ in range(int(sleep_time)):
-                    if not self._running:
-                        break
-                    await asyncio.sleep(1)
+                # One timed wait per cycle instead of waking every second to poll
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), sleep_time)
+                except asyncio.TimeoutError:
+                    pass
         
         finally:
             await self._cleanup()
     
     async def _reload_scanners(self):
         """Reload scanners when config changes."""
-        # Close old scanners
+        # Close old scanners (session is rebuilt with the new headers)
         for scanner in self._scanners.values():
             await scanner.close()
         self._scanners.clear()
+        await close_shared_session()
         
         # Reload config
         from config import get_config
@@ -160,26 +199,18 @@ class FlashNewsHunter:
             if not links:
                 return 0
             
-            # 2. Filter already-seen
-            new_urls = self.storage.filter_new_urls([l.url for l in links])
-            new_links = [l for l in links if l.url in new_urls]
+            # 2. Filter already-seen (only build ArticleLinks for new URLs)
+            new_links = links.subset(await self._archiver.filter_new_urls(links.urls))
             
             if not new_links:
                 return 0
             
             self._log(f"[{source_name}] {len(new_links)} new", "info")
             
-            # 3. Capture articles CONCURRENTLY (max 5 at a time)
-            semaphore = asyncio.Semaphore(5)
+            # 3. Capture articles CONCURRENTLY (max 5 at a time per host)
+            articles = await self._archiver.capture_many(new_links, source_name)
             
-            async def capture_with_limit(link):
-                async with semaphore:
-                    return await self._archiver.capture(link, source_name)
-            
-            capture_tasks = [capture_with_limit(link) for link in new_links]
-            articles = await asyncio.gather(*capture_tasks, return_exceptions=True)
-            
-            captured = sum(1 for a in articles if a is not None and not isinstance(a, Exception))
+            captured = sum(1 for a in articles if a is not None)
         
         except Exception as e:
             self._log(f"[{source_name}] Error: {e}", "error")
@@ -190,11 +221,14 @@ class FlashNewsHunter:
         """Stop the capture loop gracefully."""
         self._log("Stopping...", "warning")
         self._running = False
+        if self._stop_event:
+            self._stop_event.set()
     
     async def _cleanup(self):
         """Clean up resources."""
         for scanner in self._scanners.values():
             await scanner.close()
+        await close_shared_session()
         
         if self._archiver:
             await self._archiver.close()
@@ -216,11 +250,19 @@ class FlashNewsHunter:
         """Check and update link status for recent articles."""
         self._log("Checking link health...", "info")
         
-        articles = self.storage.get_stream(limit)
+        articles = self.storage.get_stream_summary(limit)
         dead_count = 0
         
-        for article in articles:
-            alive = await self._archiver.check_link_alive(article.url)
+        # HEAD requests, max 10 in flight
+        semaphore = asyncio.Semaphore(10)
+        
+        async def check_with_limit(article):
+            async with semaphore:
+                return await self._archiver.check_link_alive(article.url)
+        
+        results = await asyncio.gather(*(check_with_limit(a) for a in articles))
+        
+        for article, alive in zip(articles, results):
             if not alive:
                 dead_count += 1
                 self._log(f"🔴 Dead: {article.title[:30]}...", "warning")
@@ -245,6 +287,7 @@ class SourceMonitor:
         
         self.scanner = Scanner(source)
         self._running = False
+        self._stop_event: Optional[asyncio.Event] = None  # wakes the idle wait on stop()
     
     def _log(self, msg: str, level: str = "info"):
         if self.on_log:
@@ -253,6 +296,7 @@ class SourceMonitor:
     async def run(self):
         """Run continuous monitoring."""
         self._running = True
+        self._stop_event = asyncio.Event()
         self._log(f"[{self.source.name}] Started ({self.poll_interval}s)", "success")
         
         while self._running:
@@ -269,22 +313,26 @@ class SourceMonitor:
             except Exception as e:
                 self._log(f"[{self.source.name}] Error: {e}", "error")
             
-            # Wait
-            for _ in range(self.poll_interval):
-                if not self._running:
-                    break
-                await asyncio.sleep(1)
+            # Wait (one timed wait, cut short by stop())
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
         
         await self.scanner.close()
         self._log(f"[{self.source.name}] Stopped", "warning")
     
     def stop(self):
         self._running = False
+        if self._stop_event:
+            self._stop_event.set()
 
 
 # === CLI Entry Point ===
 async def main():
     """CLI entry point."""
+    setup_logging()
+    
     print("=" * 50)
     print("  FLASH NEWS HUNTER")
     print("  Capture First, Review Later")
@@ -323,7 +371,9 @@ async def main():
     print(f"  Scans: {stats['scans']}")
     print(f"  Captured: {stats['captured']}")
     print(f"  DB Total: {stats['storage']['total']}")
+    
+    hunter.storage.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    (uvloop.run if uvloop else asyncio.run)(main())
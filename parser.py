@@ -5,7 +5,7 @@ Multi-site HTML parser with site-specific selectors.
 
 import re
 from datetime import datetime
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Union
 from bs4 import BeautifulSoup, Comment
 from urllib.parse import urljoin
 
@@ -30,16 +30,17 @@ class ArticleParser:
         self.config = get_config()
         self._default_selectors = SelectorSet()
     
-    def parse(self, html: str, url: str, source_name: str = "", 
-              site_code: str = "TNO") -> Optional[Article]:
+    def parse(self, html: Union[str, bytes], url: str, source_name: str = "", 
+              site_code: str = "TNO", encoding: Optional[str] = None) -> Optional[Article]:
         """
         Parse article HTML with site-specific selectors.
         
         Args:
-            html: Raw HTML content
+            html: Raw HTML content (str, or undecoded response bytes)
             url: Article URL
             source_name: Source config name
             site_code: Site code for selector lookup
+            encoding: Charset for bytes input (None = sniff <meta>/BOM)
             
         Returns:
             Article object or None if parsing fails
@@ -50,11 +51,12 @@ class ArticleParser:
             if not selectors.title:
                 selectors = self._default_selectors
             
-            # Parse HTML
+            # Parse HTML (bytes are decoded by the parser, not up front)
+            kwargs = {'from_encoding': encoding} if encoding and isinstance(html, bytes) else {}
             try:
-                soup = BeautifulSoup(html, 'lxml')
+                soup = BeautifulSoup(html, 'lxml', **kwargs)
             except:
-                soup = BeautifulSoup(html, 'html.parser')
+                soup = BeautifulSoup(html, 'html.parser', **kwargs)
             
             article_id = self._extract_id(url)
             source = self._extract_source(url)
@@ -6,18 +6,204 @@ Supports RSS, Sitemap XML, and HTML fallback.
 
 import asyncio
 import aiohttp
+import atexit
+import concurrent.futures
+import hashlib
+import html
+import json
+import logging
+import os
+import random
 import re
+import tempfile
+import threading
+import time
+import weakref
+from bisect import bisect_right
+from itertools import accumulate
 from datetime import datetime
-from typing import List, Tuple, Optional
-from dataclasses import dataclass
-import xml.etree.ElementTree as ET
+from typing import Dict, List, Tuple, Optional
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import urljoin
+import lxml.html
+from lxml import etree
+from lxml.cssselect import CSSSelector
 
 from config import get_config, SourceConfig
 
+logger = logging.getLogger(__name__)
 
-@dataclass
+# Always ask for compressed bodies (sitemaps shrink ~10x); aiohttp can only
+# decode brotli when the brotli package is installed.
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+# One session (and connection pool) per event loop, shared by every Scanner.
+# The GUI runs the hunter and deep scans on separate loops, and an aiohttp
+# session cannot cross loops.
+_shared_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = \
+    weakref.WeakKeyDictionary()
+
+
+async def get_shared_session() -> aiohttp.ClientSession:
+    """Get or create the shared scanner session for the running loop."""
+    # No await between lookup and insert, so concurrent callers on the
+    # same loop cannot race to build two sessions.
+    loop = asyncio.get_running_loop()
+    session = _shared_sessions.get(loop)
+    if session is None or session.closed:
+        config = get_config()
+        connector = aiohttp.TCPConnector(
+            limit=100,
+            limit_per_host=8,
+            ttl_dns_cache=300,
+            keepalive_timeout=60
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=config.worker.timeout + 5,  # Extra time for XML parsing
+            connect=5
+        )
+        session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            headers={**config.headers, 'Accept-Encoding': ACCEPT_ENCODING}
+        )
+        _shared_sessions[loop] = session
+    return session
+
+
+async def close_shared_session():
+    """Close the running loop's shared session (once, on shutdown/reload)."""
+    session = _shared_sessions.pop(asyncio.get_running_loop(), None)
+    if session and not session.closed:
+        await session.close()
+
+
+# lxml releases the GIL while parsing, so parses run here instead of
+# blocking the event loop that other scanners are fetching on.
+_PARSE_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="scanner-parse")
+
+
+# Plain sitemap fast path: <loc> (+ optional <lastmod>) pulled straight from raw XML
+_LOC_RE = re.compile(
+    rb'<loc>\s*([^<]+?)\s*</loc>(?:\s*<lastmod>\s*([^<]+?)\s*</lastmod>)?', re.I
+)
+
+# Article URL rules: skip category/tag/static pages, keep article-like tails
+_SKIP_PATTERN = r'/(?:tag|category|author|page|search|login|register)/|\.(?:css|js|png|jpg|gif|ico|svg)$'
+_ARTICLE_PATTERN = r'\.(?:htm|html|aspx)$|/\d+/?$'
+_SKIP_RE = re.compile(_SKIP_PATTERN, re.I)
+_ARTICLE_EXT_RE = re.compile(_ARTICLE_PATTERN, re.I)
+
+# Per-line classifier for a newline-joined URL batch (same rules as _is_article_url)
+_URL_CLASS_RE = re.compile(
+    f'(?P<skip>{_SKIP_PATTERN})|(?P<article>{_ARTICLE_PATTERN})', re.I | re.M
+)
+
+# Article ID patterns for different sites, fused into one regex. Each branch
+# is an anchored lookahead so the first pattern that matches anywhere wins,
+# exactly like trying them one by one.
+_ARTICLE_ID_RE = re.compile(
+    r'^(?:'
+    r'(?=.*?-(?P<p1>\d{15,20})\.htm)'        # Thanh Niên: -185260107154311932.htm
+    r'|(?=.*?-(?P<p2>\d{6,10})\.htm)'        # Tuổi Trẻ: -20260108.htm
+    r'|(?=.*?/(?P<p3>\d{6,12})\.html?)'      # VnExpress: /4851234.html
+    r'|(?=.*?-(?P<p4>\d+)\.html?)'           # Generic: -123456.html
+    r'|(?=.*?/(?P<p5>[a-z0-9-]+)-\d+\.htm)'  # Slug-based
+    r')'
+)
+
+# Generic article link selectors for the HTML homepage fallback
+HTML_LINK_SELECTOR = ', '.join([
+    'a.box-category-link-title',  # Thanh Niên
+    'h3 a', 'h2 a',               # Common patterns
+    '.article-title a',
+    '.news-title a',
+])
+_HTML_LINK_SEL = CSSSelector(HTML_LINK_SELECTOR)
+
+# Cache-Control: max-age=N (ignored when no-cache/no-store is present)
+_MAX_AGE_RE = re.compile(r'(?<![-\w])max-age\s*=\s*(\d+)', re.I)
+
+# Deep scan helpers
+_DATE_CLEAN_RE = re.compile(r'(\d{1,2}/\d{1,2}/\d{4})')
+_DEEP_ITEM_SEL = CSSSelector('article, .box-category-item, .story')
+
+# HTTP validators per URL: url -> [Last-Modified, ETag]. Shared by all
+# scanners and persisted so conditional GETs survive restarts.
+_VALIDATORS_FILE = "scanner_state.json"
+_VALIDATORS_SAVE_DELAY = 2.0  # seconds; coalesces the writes of one scan round
+_validators: Optional[Dict[str, List[Optional[str]]]] = None
+# Scanners run on several threads/loops (GUI hunter + deep scan), so a thread lock
+_validators_lock = threading.Lock()
+# Serializes file writes so an older snapshot never replaces a newer one
+_validators_write_lock = threading.Lock()
+_validators_timer: Optional[threading.Timer] = None
+
+
+def _validators_path() -> Path:
+    return Path(get_config().storage.path) / _VALIDATORS_FILE
+
+
+def _load_validators() -> Dict[str, List[Optional[str]]]:
+    """Load persisted validators once per process."""
+    global _validators
+    with _validators_lock:
+        if _validators is None:
+            try:
+                _validators = json.loads(_validators_path().read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                _validators = {}
+        return _validators
+
+
+def _set_validators(url: str, validators: List[Optional[str]]):
+    """Record validators for url; the file write is debounced onto a timer thread."""
+    global _validators_timer
+    with _validators_lock:
+        if _validators.get(url) == validators:
+            return
+        _validators[url] = validators
+        if _validators_timer is None:
+            _validators_timer = threading.Timer(_VALIDATORS_SAVE_DELAY, _save_validators)
+            _validators_timer.daemon = True
+            _validators_timer.start()
+
+
+def _save_validators():
+    """Write validators atomically (temp file + rename) so a crash never truncates them."""
+    global _validators_timer
+    path = _validators_path()
+    with _validators_write_lock:
+        # Dump a copy taken under the lock: scanners keep mutating the live dict
+        with _validators_lock:
+            if _validators_timer is None:
+                return  # nothing changed since the last write
+            _validators_timer.cancel()
+            _validators_timer = None
+            snapshot = dict(_validators)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                'w', encoding='utf-8', dir=path.parent, suffix='.tmp', delete=False
+            ) as tmp:
+                json.dump(snapshot, tmp)
+            os.replace(tmp.name, path)
+        except OSError as e:
+            logger.warning("[Scanner] Could not save validators: %s", e)
+
+
+# Flush a pending debounced write on interpreter exit
+atexit.register(_save_validators)
+
+
+@dataclass(frozen=True, slots=True, eq=False)
 class ArticleLink:
-    """Discovered article metadata from scanner."""
+    """Discovered article metadata from scanner (immutable, slotted, url identity)."""
     url: str
     title: str
     article_id: str
@@ -30,6 +216,170 @@ class ArticleLink:
         return self.url == other.url
 
 
+@dataclass(slots=True)
+class ArticleBatch:
+    """
+    Scan results stored column-wise (parallel lists).
+    ArticleLink objects are only built on demand when iterating.
+    """
+    urls: List[str] = field(default_factory=list)
+    titles: List[str] = field(default_factory=list)
+    ids: List[str] = field(default_factory=list)
+    published: List[Optional[str]] = field(default_factory=list)
+    
+    def append(self, url: str, title: str, article_id: str, published: Optional[str] = None):
+        self.urls.append(url)
+        self.titles.append(title)
+        self.ids.append(article_id)
+        self.published.append(published)
+    
+    def __len__(self) -> int:
+        return len(self.urls)
+    
+    def __getitem__(self, i: int) -> ArticleLink:
+        return ArticleLink(self.urls[i], self.titles[i], self.ids[i], self.published[i])
+    
+    def __iter__(self):
+        for row in zip(self.urls, self.titles, self.ids, self.published):
+            yield ArticleLink(*row)
+    
+    def subset(self, urls) -> List[ArticleLink]:
+        """Build ArticleLink objects only for the given URLs."""
+        wanted = set(urls)
+        return [
+            ArticleLink(*row)
+            for row in zip(self.urls, self.titles, self.ids, self.published)
+            if row[0] in wanted
+        ]
+
+
+class _XmlStream:
+    """
+    Incremental RSS/Sitemap parser fed with response chunks, so parsing
+    overlaps the download and only the current element is kept in memory
+    (the plain-sitemap fast path also keeps the raw body to fall back on).
+    The format is picked once the first bytes (root tag) have arrived.
+    Only element collection happens while feeding; close() does the ID
+    extraction and URL classification, so it can be skipped entirely for
+    an unchanged body. Both are CPU work meant for _PARSE_POOL.
+    """
+    HEAD_BYTES = 4096
+    
+    def __init__(self, scanner: 'Scanner'):
+        self._scanner = scanner
+        self._head = b''
+        self._mode = None   # 'locs' (plain sitemap regex path) or 'tree'
+        self._parser = None
+        self._tail = b''    # bytes after the last complete </url> (locs mode)
+        self._body: List[bytes] = []  # raw chunks so far (locs mode), for the fallback
+        self._locs: List[Tuple[bytes, bytes]] = []
+        self._rss_rows: List[Tuple[str, str, Optional[str]]] = []
+        self._sitemap_rows: List[Tuple[str, str, Optional[str]]] = []
+        self._seen = set()
+        self.failed = False  # hit an XML syntax error: results may be partial
+    
+    def feed(self, chunk: bytes):
+        if self._mode is None:
+            self._head += chunk
+            if len(self._head) < self.HEAD_BYTES:
+                return
+            self._start()
+            chunk, self._head = self._head, b''
+        self._feed(chunk)
+    
+    def close(self) -> ArticleBatch:
+        """Finish parsing and return the discovered articles."""
+        if self._mode is None:
+            self._start()
+            self._feed(self._head)
+        
+        if self._mode == 'locs' and b'<loc' in self._tail:
+            # A <loc> outside any complete <url>: let the full parser make sense of it
+            self._start_tree(b''.join(self._body))
+        
+        if self._mode == 'locs':
+            return self._scanner._parse_sitemap_locs(self._locs)
+        
+        if self._parser is not None:
+            try:
+                self._parser.close()
+                self._drain()
+            except etree.XMLSyntaxError as e:
+                logger.error("[Scanner:%s] XML parse error: %s", self._scanner.source.name, e)
+                self.failed = True
+        
+        # RSS format takes precedence (<url> may also appear inside <image>)
+        if self._rss_rows:
+            return self._scanner._rss_batch(self._rss_rows)
+        return self._scanner._sitemap_batch(self._sitemap_rows)
+    
+    def _start(self):
+        # Plain sitemaps carry nothing but loc/lastmod, so a regex sweep replaces
+        # building the tree. Google News sitemaps declare the news namespace on
+        # the root and still go through the full parse.
+        head = self._head
+        root = head.find(b'<urlset')
+        end = head.find(b'>', root) if root >= 0 else -1
+        if end >= 0 and b'news' not in head[root:end]:
+            self._mode = 'locs'
+        else:
+            self._start_tree()
+    
+    def _start_tree(self, pending: bytes = b''):
+        """Switch to the full pull parser, feeding it any bytes buffered so far."""
+        self._mode = 'tree'
+        self._tail = b''
+        self._body = []
+        self._locs = []  # the full parse starts over from the first byte
+        # Namespaced tags are matched natively via {*}
+        self._parser = etree.XMLPullParser(
+            events=('end',), tag=('{*}item', '{*}url'), recover=True, huge_tree=False
+        )
+        if pending:
+            self._feed(pending)
+    
+    def _feed(self, chunk: bytes):
+        if self._mode == 'locs':
+            self._body.append(chunk)
+            # Only sweep up to the last complete </url>; the rest waits for more bytes
+            buf = self._tail + chunk
+            cut = buf.rfind(b'</url>')
+            if cut < 0:
+                self._tail = buf
+                return
+            cut += len(b'</url>')
+            locs = _LOC_RE.findall(buf, 0, cut)
+            # Every <url> must give one full match: CDATA locs or a <lastmod>
+            # before <loc> slip past the regex, so any mismatch means full parse
+            if (len(locs) != buf.count(b'</url>', 0, cut)
+                    or sum(1 for _, lastmod in locs if lastmod) != buf.count(b'<lastmod', 0, cut)):
+                self._start_tree(b''.join(self._body))
+                return
+            self._locs.extend(locs)
+            self._tail = buf[cut:]
+        elif self._parser is not None:
+            try:
+                self._parser.feed(chunk)
+                self._drain()
+            except etree.XMLSyntaxError as e:
+                logger.error("[Scanner:%s] XML parse error: %s", self._scanner.source.name, e)
+                self.failed = True
+                self._parser = None
+    
+    def _drain(self):
+        scanner = self._scanner
+        for _, elem in self._parser.read_events():
+            if etree.QName(elem).localname == 'item':
+                scanner._parse_rss_item(elem, self._rss_rows, self._seen)
+            else:
+                scanner._parse_sitemap_url(elem, self._sitemap_rows, self._seen)
+            
+            # Free handled elements so memory stays flat on large sitemaps
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
+
 class Scanner:
     """
     Lightweight article scanner for a specific source.
@@ -38,15 +388,6 @@ class Scanner:
     - HTML mode: Fallback to scraping homepage
     """
     
-    # Multiple patterns for different sites
-    ARTICLE_ID_PATTERNS = [
-        re.compile(r'-(\d{15,20})\.htm'),     # Thanh Niên: -185260107154311932.htm
-        re.compile(r'-(\d{6,10})\.htm'),       # Tuổi Trẻ: -20260108.htm
-        re.compile(r'/(\d{6,12})\.html?'),     # VnExpress: /4851234.html
-        re.compile(r'-(\d+)\.html?'),          # Generic: -123456.html
-        re.compile(r'/([a-z0-9-]+)-\d+\.htm'), # Slug-based
-    ]
-    
     def __init__(self, source: SourceConfig):
         """
         Initialize scanner for a specific source.
@@ -56,41 +397,63 @@ class Scanner:
         """
         self.source = source
         self.config = get_config()
-        self._last_modified = None
-        self._etag = None
-        self._session: Optional[aiohttp.ClientSession] = None
+        self._cond = _load_validators()
+        self._last_body_hash: Optional[bytes] = None
+        self._fresh_until = 0.0  # monotonic deadline from Cache-Control: max-age
+        # HTML pages: body fingerprint of the last 200, per URL
+        self._body_fp: Dict[str, bytes] = {}
     
     async def _get_session(self) -> aiohttp.ClientSession:
-        """Get or create aiohttp session."""
-        if self._session is None or self._session.closed:
-            timeout = aiohttp.ClientTimeout(
-                total=self.config.worker.timeout + 5,  # Extra time for XML parsing
-                connect=5
-            )
-            self._session = aiohttp.ClientSession(
-                timeout=timeout,
-                headers=self.config.headers
-            )
-        return self._session
+        """Get the shared aiohttp session."""
+        return await get_shared_session()
     
     async def close(self):
-        """Close session."""
-        if self._session and not self._session.closed:
-            await self._session.close()
+        """No-op: the shared session is closed via close_shared_session()."""
+    
+    def _conditional_headers(self, url: str) -> Dict[str, str]:
+        """Build If-Modified-Since / If-None-Match from the last 200 for url."""
+        headers = {}
+        last_modified, etag = self._cond.get(url, (None, None))
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        if etag:
+            headers['If-None-Match'] = etag
+        return headers
+    
+    def _store_validators(self, url: str, headers):
+        """
+        Remember validators of a 200/226 response (persisted when changed).
+        Only call this once the body was fully read and parsed: a stored ETag
+        turns the next requests into 304s, so a lost body would never come back.
+        """
+        _set_validators(url, [headers.get('Last-Modified'), headers.get('ETag')])
+    
+    @staticmethod
+    def _max_age(headers) -> int:
+        """Seconds the response may be reused per Cache-Control (0 if none)."""
+        cache_control = headers.get('Cache-Control', '')
+        if 'no-cache' in cache_control or 'no-store' in cache_control:
+            return 0
+        match = _MAX_AGE_RE.search(cache_control)
+        return int(match.group(1)) if match else 0
     
     def _extract_article_id(self, url: str) -> str:
         """Extract article ID from URL using multiple patterns."""
-        for pattern in self.ARTICLE_ID_PATTERNS:
-            match = pattern.search(url)
-            if match:
-                return match.group(1)
-        # Fallback: use last path segment or hash
-        match = re.search(r'/([^/]+?)(?:\.htm|\.html)?$', url)
+        match = _ARTICLE_ID_RE.match(url)
         if match:
-            return match.group(1)[:50]
-        return str(abs(hash(url)))
+            return match.group(match.lastgroup)
+        # Fallback: use last path segment (minus .htm/.html) or a stable hash
+        tail = url.rstrip('/').rsplit('/', 1)[-1]
+        for ext in ('.html', '.htm'):
+            if tail.endswith(ext) and len(tail) > len(ext):
+                tail = tail[:-len(ext)]
+                break
+        if tail:
+            return tail[:50]
+        # hash() is salted per process; blake2b keeps IDs identical across restarts
+        return hashlib.blake2b(url.encode('utf-8'), digest_size=8).hexdigest()
     
-    async def scan(self, min_timestamp: Optional[datetime] = None) -> List[ArticleLink]:
+    async def scan(self, min_timestamp: Optional[datetime] = None) -> ArticleBatch:
         """
         Scan for new articles.
         
@@ -98,9 +461,8 @@ class Scanner:
             min_timestamp: Ignore articles older than this (if date available)
             
         Returns:
-            List of ArticleLink found
+            ArticleBatch of links found
         """
-        links = []
         if self.source.type == "rss":
             links = await self._scan_xml()
         else:
@@ -108,17 +470,18 @@ class Scanner:
             
         # Basic filtering by timestamp if needed
         if min_timestamp:
-            filtered = []
-            for link in links:
-                if not link.published:
-                    filtered.append(link)
+            filtered = ArticleBatch()
+            for row in zip(links.urls, links.titles, links.ids, links.published):
+                published = row[3]
+                if not published:
+                    filtered.append(*row)
                     continue
                 try:
-                    pub = datetime.fromisoformat(link.published) if isinstance(link.published, str) else link.published
+                    pub = datetime.fromisoformat(published)
                     if pub >= min_timestamp:
-                        filtered.append(link)
+                        filtered.append(*row)
                 except:
-                    filtered.append(link)
+                    filtered.append(*row)
             return filtered
             
         return links
@@ -126,6 +489,7 @@ class Scanner:
     async def scan_by_date(self, target_date: datetime.date, progress_callback=None) -> List[ArticleLink]:
         """
         Deep Scan: Find articles for a specific date by backtracking pages.
+        Pages are fetched in small concurrent batches, then parsed in order.
         """
         config = self.source.deep_scan
         if not config:
@@ -134,346 +498,387 @@ class Scanner:
             return []
             
         links = []
-        page = 1
-        found_target_date = False
-        
-        import random
-        from bs4 import BeautifulSoup
+        seen = set()
         
         # Max pages safety limit
         MAX_PAGES = 50 
+        # Pages fetched per batch, and max concurrent GETs (politeness)
+        BATCH_SIZE = 5
+        semaphore = asyncio.Semaphore(3)
+        
+        session = await self._get_session()
+        date_sel = CSSSelector(config.date_css) if config.date_css else None
         
-        # Ensure session
-        await self._get_session()
+        # Page URL prefix built once; only the page number varies
+        sep = '&' if '?' in config.base_url else '?'
+        page_prefix = f"{config.base_url}{sep}{config.page_param}="
         
-        while page <= MAX_PAGES:
-            sep = '&' if '?' in config.base_url else '?'
-            url = f"{config.base_url}{sep}{config.page_param}={page}"
+        async def fetch_page(page: int) -> Optional[str]:
+            async with semaphore:
+                async with session.get(f"{page_prefix}{page}") as resp:
+                    if resp.status != 200:
+                        return None
+                    return await resp.text()
+        
+        page = 1
+        stop = False
+        
+        while page <= MAX_PAGES and not stop:
+            batch = range(page, min(page + BATCH_SIZE, MAX_PAGES + 1))
             
             if progress_callback:
-                progress_callback(f"Scanning Page {page}...")
+                progress_callback(f"Scanning Pages {batch[0]}-{batch[-1]}...")
             
             try:
-                # Fetch page
-                async with self.session.get(url) as resp:
-                    if resp.status != 200:
-                        break
-                    html = await resp.text()
-                
-                soup = BeautifulSoup(html, 'lxml')
-                items = soup.select('article, .box-category-item, .story')
+                # A failed page must not discard the pages fetched before it
+                pages = await asyncio.gather(*(fetch_page(p) for p in batch), return_exceptions=True)
                 
-                if not items:
-                    # Fallback to searching for date elements directly
-                    items = soup.select(config.date_css)
-                    if not items:
-                        if progress_callback: progress_callback(f"No items found on page {page}")
+                for p, html in zip(batch, pages):
+                    if isinstance(html, BaseException):
+                        logger.error("[Scanner:%s] Deep scan page %d error: %r", self.source.name, p, html)
+                        html = None
+                    if html is None:
+                        stop = True
                         break
-                
-                # Check dates on this page
-                page_dates = []
-                
-                for item in items:
-                   # Locate date element
-                   if item.name == 'span' or 'time' in item.get('class', []):
-                       date_elem = item
-                       parent = item.find_parent('article') or item.find_parent('div', class_=re.compile(r'item|box'))
-                       if parent: item = parent
-                   else:
-                       date_elem = item.select_one(config.date_css)
-
-                   if not date_elem:
-                       continue
-                       
-                   date_str = date_elem.get_text(strip=True)
-                   
-                   # Extract Link
-                   a_tag = item.find('a', href=True)
-                   if not a_tag:
-                       if item.name == 'a': a_tag = item
-                       else: continue
-                       
-                   link_url = a_tag['href']
-                   if not link_url.startswith('http'):
-                       from urllib.parse import urljoin
-                       link_url = urljoin(config.base_url, link_url)
-                       
-                   link = ArticleLink(
-                       url=link_url, 
-                       title=a_tag.get('title') or a_tag.get_text(strip=True),
-                       article_id=self._extract_article_id(link_url)
-                   )
-                   
-                   # Compare Date
-                   try:
-                       clean_date = re.search(r'(\d{1,2}/\d{1,2}/\d{4})', date_str)
-                       if clean_date:
-                           date_str = clean_date.group(1)
-                       
-                       article_date = datetime.strptime(date_str, config.date_format).date()
-                       page_dates.append(article_date)
-                       
-                       if article_date == target_date:
-                           found_target_date = True
-                           if link not in links:
-                               links.append(link)
-                               print(f"[Scanner deep] Found: {link.url}")
-                       
-                   except Exception as e:
-                       continue
-
-                # Decision Logic
-                if not page_dates:
-                    break
                     
-                max_page_date = max(page_dates)
-                if progress_callback:
-                    progress_callback(f"Page {page} dates: {min(page_dates)} -> {max_page_date}")
-
-                # If ALL dates on this page are older than target -> STOP
-                if max_page_date < target_date:
-                    if progress_callback: progress_callback(f"⏹️ Reached older data ({max_page_date}). Stopping.")
-                    break
+                    page_dates = await asyncio.get_running_loop().run_in_executor(
+                        _PARSE_POOL, self._parse_deep_page, html, config, date_sel, target_date, links, seen
+                    )
+                    
+                    # Decision Logic
+                    if page_dates is None:
+                        if progress_callback: progress_callback(f"No items found on page {p}")
+                        stop = True
+                        break
+                    
+                    if not page_dates:
+                        stop = True
+                        break
+                    
+                    max_page_date = max(page_dates)
+                    if progress_callback:
+                        progress_callback(f"Page {p} dates: {min(page_dates)} -> {max_page_date}")
+                    
+                    # If ALL dates on this page are older than target -> STOP
+                    if max_page_date < target_date:
+                        if progress_callback: progress_callback(f"⏹️ Reached older data ({max_page_date}). Stopping.")
+                        stop = True
+                        break
                 
-                page += 1
+            except Exception:
+                logger.exception("[Scanner:%s] Deep scan error", self.source.name)
+                break
+            
+            page += BATCH_SIZE
+            if not stop:
                 await asyncio.sleep(random.uniform(1.0, 2.0))
+        
+        logger.info("[Scanner:%s] Deep scan: Found %d articles", self.source.name, len(links))
+        return links
+    
+    def _parse_deep_page(self, html: str, config, date_sel, target_date,
+                         links: List[ArticleLink], seen: set):
+        """
+        Parse one deep-scan page, appending links dated target_date.
+        `seen` holds the URLs already in `links` (O(1) dedup).
+        
+        Returns:
+            Dates seen on the page, or None if the page has no items
+        """
+        doc = lxml.html.fromstring(html)
+        items = _DEEP_ITEM_SEL(doc)
+        
+        if not items:
+            # Fallback to searching for date elements directly
+            items = date_sel(doc) if date_sel else []
+            if not items:
+                return None
+        
+        # Check dates on this page
+        page_dates = []
+        
+        for item in items:
+            # Locate date element
+            if item.tag == 'span' or 'time' in item.get('class', '').split():
+                date_elem = item
+                parent = next(item.iterancestors('article'), None)
+                if parent is None:
+                    # Plain substring tests on the class attribute (was an item|box regex)
+                    parent = next(
+                        (p for p in item.iterancestors('div')
+                         if 'item' in (cls := p.get('class', '')) or 'box' in cls),
+                        None
+                    )
+                if parent is not None: item = parent
+            else:
+                found = date_sel(item) if date_sel else []
+                date_elem = found[0] if found else None
+            
+            if date_elem is None:
+                continue
+            
+            date_str = date_elem.text_content().strip()
+            
+            # Extract Link (item itself may be the <a>)
+            a_tag = next((a for a in item.iter('a') if a.get('href')), None)
+            if a_tag is None:
+                continue
+            
+            href = a_tag.get('href')
+            link_url = href if href[:4] == 'http' else urljoin(config.base_url, href)
+            
+            # Compare Date
+            try:
+                clean_date = _DATE_CLEAN_RE.search(date_str)
+                if clean_date:
+                    date_str = clean_date.group(1)
                 
-            except Exception as e:
-                print(f"[Scanner] Deep scan error: {e}")
-                import traceback
-                traceback.print_exc()
-                break
+                article_date = datetime.strptime(date_str, config.date_format).date()
+                page_dates.append(article_date)
                 
-        return links
+                # Only matching items become ArticleLinks (positional construction)
+                if article_date == target_date and link_url not in seen:
+                    seen.add(link_url)
+                    links.append(ArticleLink(
+                        link_url,
+                        a_tag.get('title') or a_tag.text_content().strip(),
+                        self._extract_article_id(link_url)
+                    ))
+                
+            except Exception as e:
+                continue
+        
+        return page_dates
     
-    async def _scan_xml(self) -> List[ArticleLink]:
+    async def _scan_xml(self) -> ArticleBatch:
         """
         Scan RSS/Sitemap XML feed.
         Handles both RSS <item> and Sitemap <url> formats.
         """
         url = self.source.url
+        
+        # Server said the last response is still fresh: no request at all
+        if time.monotonic() < self._fresh_until:
+            logger.debug("[Scanner:%s] XML still fresh (max-age)", self.source.name)
+            return ArticleBatch()
+        
         session = await self._get_session()
         
-        # Build conditional headers
-        headers = dict(self.config.headers)
-        if self._last_modified:
-            headers['If-Modified-Since'] = self._last_modified
-        if self._etag:
-            headers['If-None-Match'] = self._etag
+        # Conditional headers only (session already carries the defaults)
+        headers = self._conditional_headers(url)
+        if headers:
+            # RFC 3229 delta encoding: capable servers answer 226 with only new items
+            headers['A-IM'] = 'feed'
         
         try:
             async with session.get(url, headers=headers) as resp:
                 if resp.status == 304:
-                    print(f"[Scanner:{self.source.name}] XML not modified (304)")
-                    return []
+                    logger.info("[Scanner:%s] XML not modified (304)", self.source.name)
+                    return ArticleBatch()
                 
-                if resp.status != 200:
-                    print(f"[Scanner:{self.source.name}] XML error: {resp.status}")
-                    return []
+                if resp.status not in (200, 226):
+                    logger.warning("[Scanner:%s] XML error: %s", self.source.name, resp.status)
+                    return ArticleBatch()
                 
-                self._last_modified = resp.headers.get('Last-Modified')
-                self._etag = resp.headers.get('ETag')
-                
-                content = await resp.text()
-                return self._parse_xml(content)
+                resp_headers = resp.headers
                 
+                # Parse chunks as they arrive; each is hashed too, since some
+                # CDNs answer 200 with a byte-identical body instead of 304
+                digest = hashlib.blake2b(digest_size=16)
+                stream = _XmlStream(self)
+                loop = asyncio.get_running_loop()
+                async for chunk in resp.content.iter_chunked(65536):
+                    digest.update(chunk)
+                    # Parsing is CPU work: keep it off the loop other scanners fetch on
+                    await loop.run_in_executor(_PARSE_POOL, stream.feed, chunk)
+            
+            # Compare before close(): an identical body needs no IDs or classification
+            body_hash = digest.digest()
+            unchanged = body_hash == self._last_body_hash
+            if not unchanged:
+                articles = await loop.run_in_executor(_PARSE_POOL, stream.close)
+        
         except asyncio.TimeoutError:
-            print(f"[Scanner:{self.source.name}] XML timeout")
-            return []
+            logger.warning("[Scanner:%s] XML timeout", self.source.name)
+            return ArticleBatch()
         except Exception as e:
-            print(f"[Scanner:{self.source.name}] XML error: {e}")
-            return []
+            logger.error("[Scanner:%s] XML error: %s", self.source.name, e)
+            return ArticleBatch()
+        
+        # Body fully read and parsed: only now may the validators be reused
+        if not stream.failed:
+            self._store_validators(url, resp_headers)
+            self._fresh_until = time.monotonic() + self._max_age(resp_headers)
+        
+        if unchanged:
+            logger.info("[Scanner:%s] XML unchanged body", self.source.name)
+            return ArticleBatch()
+        self._last_body_hash = body_hash
+        
+        logger.info("[Scanner:%s] XML: Found %d articles", self.source.name, len(articles))
+        return articles
     
-    def _parse_xml(self, xml_content: str) -> List[ArticleLink]:
-        """
-        Parse RSS or Sitemap XML.
-        Automatically detects format and extracts articles.
-        """
-        articles = []
+    def _parse_rss_item(self, item, rows: list, seen: set):
+        """Collect one RSS <item> element as a (url, title, pubDate) row."""
+        # Handle link as text or CDATA
+        url = (item.findtext('{*}link') or "").strip()
+        if not url or url in seen:
+            return
+        seen.add(url)
         
-        try:
-            # Clean XML to remove namespaces that cause parsing errors
-            # 1. Remove xmlns declarations
-            xml_content = re.sub(r'xmlns:?[^=]*=["\'][^"\']*["\']', '', xml_content)
-            # 2. Remove namespace prefixes from attributes (e.g. news:loc -> loc)
-            xml_content = re.sub(r'\s[a-zA-Z0-9]+:([a-zA-Z0-9]+)=', r' \1=', xml_content)
-            # 3. Remove namespace prefixes from open tags (<news:item> -> <item>)
-            xml_content = re.sub(r'<(\/?)[a-zA-Z0-9]+:', r'<\1', xml_content)
-            
-            root = ET.fromstring(xml_content)
-            
-            # Try RSS format first (has <item> elements)
-            items = root.findall('.//item')
-            if items:
-                articles = self._parse_rss_items(items)
-            else:
-                # Try Sitemap format (<url> elements)
-                urls = root.findall('.//url')
-                if urls:
-                    articles = self._parse_sitemap_urls(urls)
-            
-            print(f"[Scanner:{self.source.name}] XML: Found {len(articles)} articles")
-            
-        except ET.ParseError as e:
-            print(f"[Scanner:{self.source.name}] XML parse error: {e}")
+        title = (item.findtext('{*}title') or "").strip()
+        pub_date = (item.findtext('{*}pubDate') or "").strip() or None
         
+        rows.append((url, title, pub_date))
+    
+    def _rss_batch(self, rows: List[Tuple[str, str, Optional[str]]]) -> ArticleBatch:
+        """Build the batch from collected RSS rows (IDs extracted here)."""
+        articles = ArticleBatch()
+        for url, title, pub_date in rows:
+            articles.append(url, title, self._extract_article_id(url), pub_date)
         return articles
     
-    def _parse_rss_items(self, items) -> List[ArticleLink]:
-        """Parse RSS <item> elements."""
-        articles = []
+    def _parse_sitemap_url(self, url_elem, rows: list, seen: set):
+        """Collect one Sitemap <url> element as a (url, title, lastmod) row."""
+        url = (url_elem.findtext('{*}loc') or "").strip()
+        if not url or url in seen:
+            return
+        seen.add(url)
         
-        for item in items:
-            link_elem = item.find('link')
-            title_elem = item.find('title')
-            pub_date_elem = item.find('pubDate')
-            
-            if link_elem is None:
-                continue
-            
-            # Handle link as text or CDATA
-            url = link_elem.text.strip() if link_elem.text else ""
-            if not url:
-                continue
-            
-            title = ""
-            if title_elem is not None and title_elem.text:
-                title = title_elem.text.strip()
-            
-            pub_date = None
-            if pub_date_elem is not None and pub_date_elem.text:
-                pub_date = pub_date_elem.text.strip()
-            
-            article_id = self._extract_article_id(url)
-            
-            articles.append(ArticleLink(
-                url=url,
-                title=title,
-                article_id=article_id,
-                published=pub_date
-            ))
+        # Also check for news:news elements (Google News sitemap)
+        title = ""
+        if url_elem.find('.//{*}news') is not None:
+            title = (url_elem.findtext('.//{*}title') or "").strip()
+        
+        pub_date = (url_elem.findtext('{*}lastmod') or "").strip() or None
+        
+        rows.append((url, title, pub_date))
+    
+    def _sitemap_batch(self, rows: List[Tuple[str, str, Optional[str]]]) -> ArticleBatch:
+        """Keep article-like rows (one classification sweep) and build the batch."""
+        articles = ArticleBatch()
+        
+        # Skip non-article URLs (categories, tags, etc.) in a single pass
+        for i in self._filter_article_urls([row[0] for row in rows]):
+            url, title, pub_date = rows[i]
+            articles.append(url, title, self._extract_article_id(url), pub_date)
         
         return articles
     
-    def _parse_sitemap_urls(self, urls) -> List[ArticleLink]:
-        """Parse Sitemap <url> elements."""
-        articles = []
+    def _parse_sitemap_locs(self, locs: List[Tuple[bytes, bytes]]) -> ArticleBatch:
+        """Parse raw (loc, lastmod) pairs matched by the sitemap fast path."""
+        articles = ArticleBatch()
         
-        for url_elem in urls:
-            loc_elem = url_elem.find('loc')
-            lastmod_elem = url_elem.find('lastmod')
-            
-            # Also check for news:news elements (Google News sitemap)
-            news_elem = url_elem.find('.//news')
-            title_elem = url_elem.find('.//title') if news_elem is not None else None
-            
-            if loc_elem is None or not loc_elem.text:
-                continue
-            
-            url = loc_elem.text.strip()
-            
-            # Skip non-article URLs (categories, tags, etc.)
-            if not self._is_article_url(url):
-                continue
-            
-            title = ""
-            if title_elem is not None and title_elem.text:
-                title = title_elem.text.strip()
-            
-            pub_date = None
-            if lastmod_elem is not None and lastmod_elem.text:
-                pub_date = lastmod_elem.text.strip()
-            
-            article_id = self._extract_article_id(url)
-            
-            articles.append(ArticleLink(
-                url=url,
-                title=title,
-                article_id=article_id,
-                published=pub_date
-            ))
+        # Dedup first so repeated <loc>s are never decoded, classified or ID-extracted
+        lastmods = {}
+        for loc, lastmod in locs:
+            lastmods.setdefault(loc, lastmod)
+        
+        urls = []
+        for loc in lastmods:
+            url = loc.decode('utf-8', 'replace')
+            urls.append(html.unescape(url) if '&' in url else url)
+        published = [lastmod.decode('utf-8', 'replace') or None for lastmod in lastmods.values()]
+        
+        for i in self._filter_article_urls(urls):
+            url = urls[i]
+            articles.append(url, "", self._extract_article_id(url), published[i])
         
         return articles
     
+    def _filter_article_urls(self, urls: List[str]) -> List[int]:
+        """
+        Indices of article-like URLs, classified in one regex sweep.
+        URLs are joined with newlines and each match is mapped back to its
+        URL via bisect on the line-start offsets.
+        """
+        if not urls:
+            return []
+        
+        buf = '\n'.join(urls)
+        starts = [0, *accumulate(len(url) + 1 for url in urls)]
+        skipped, articles = set(), set()
+        
+        for match in _URL_CLASS_RE.finditer(buf):
+            line = bisect_right(starts, match.start()) - 1
+            (skipped if match.lastgroup == 'skip' else articles).add(line)
+        
+        return sorted(articles - skipped)
+    
     def _is_article_url(self, url: str) -> bool:
         """Check if URL is likely an article (not category/tag page)."""
-        # Skip common non-article patterns
-        skip_patterns = [
-            r'/tag/', r'/category/', r'/author/', r'/page/',
-            r'/search/', r'/login/', r'/register/',
-            r'\.(css|js|png|jpg|gif|ico|svg)$',
-        ]
-        for pattern in skip_patterns:
-            if re.search(pattern, url, re.I):
-                return False
-        
-        # Must end with article-like extension
-        return bool(re.search(r'\.(htm|html|aspx)$', url, re.I)) or \
-               bool(re.search(r'/\d+/?$', url))  # Ends with number
+        # Skip common non-article patterns, then require an article-like tail
+        # (.htm/.html/.aspx or a trailing number)
+        return not _SKIP_RE.search(url) and bool(_ARTICLE_EXT_RE.search(url))
     
-    async def _scan_html(self) -> List[ArticleLink]:
+    async def _scan_html(self) -> ArticleBatch:
         """
         Scan HTML homepage (fallback).
         """
-        from bs4 import BeautifulSoup
-        
         url = self.source.url
         session = await self._get_session()
         
         try:
-            async with session.get(url) as resp:
+            async with session.get(url, headers=self._conditional_headers(url)) as resp:
+                if resp.status == 304:
+                    logger.info("[Scanner:%s] HTML not modified (304)", self.source.name)
+                    return ArticleBatch()
+                
                 if resp.status != 200:
-                    print(f"[Scanner:{self.source.name}] HTML error: {resp.status}")
-                    return []
+                    logger.warning("[Scanner:%s] HTML error: %s", self.source.name, resp.status)
+                    return ArticleBatch()
                 
-                html = await resp.text()
+                resp_headers = resp.headers
+                body = await resp.read()
+                html = await resp.text()  # decodes the already-read body
                 
         except Exception as e:
-            print(f"[Scanner:{self.source.name}] HTML error: {e}")
-            return []
+            logger.error("[Scanner:%s] HTML error: %s", self.source.name, e)
+            return ArticleBatch()
         
-        soup = BeautifulSoup(html, 'lxml')
-        
-        # Generic article link selectors
-        selectors = [
-            'a.box-category-link-title',  # Thanh Niên
-            'h3 a', 'h2 a',               # Common patterns
-            '.article-title a',
-            '.news-title a',
-        ]
+        # Byte-identical page (CDN without ETag): nothing new, like a 304
+        fp = hashlib.blake2b(body, digest_size=16).digest()
+        if self._body_fp.get(url) == fp:
+            logger.info("[Scanner:%s] HTML unchanged body", self.source.name)
+            self._store_validators(url, resp_headers)
+            return ArticleBatch()
         
-        articles = []
+        articles = await asyncio.get_running_loop().run_in_executor(
+            _PARSE_POOL, self._parse_html, html, url
+        )
+        self._store_validators(url, resp_headers)
+        self._body_fp[url] = fp
+        return articles
+    
+    def _parse_html(self, html: str, url: str) -> ArticleBatch:
+        """Extract article links from a homepage (runs on _PARSE_POOL)."""
+        articles = ArticleBatch()
         seen_urls = set()
         
-        for selector in selectors:
-            for link in soup.select(selector):
-                href = link.get('href', '')
-                if not href:
-                    continue
-                
-                # Make absolute URL
-                if href.startswith('/'):
-                    from urllib.parse import urlparse
-                    parsed = urlparse(url)
-                    href = f"{parsed.scheme}://{parsed.netloc}{href}"
-                
-                if href in seen_urls:
-                    continue
-                seen_urls.add(href)
-                
-                if not self._is_article_url(href):
-                    continue
-                
-                title = link.get_text(strip=True)
-                article_id = self._extract_article_id(href)
-                
-                articles.append(ArticleLink(
-                    url=href,
-                    title=title,
-                    article_id=article_id
-                ))
+        try:
+            doc = lxml.html.fromstring(html)
+        except (etree.ParserError, ValueError) as e:
+            logger.error("[Scanner:%s] HTML parse error: %s", self.source.name, e)
+            return articles
+        doc.make_links_absolute(url, handle_failures='ignore')
+        
+        # One combined query: the DOM is walked once instead of per selector
+        for link in _HTML_LINK_SEL(doc):
+            href = link.get('href', '')
+            if not href:
+                continue
+            
+            if href in seen_urls:
+                continue
+            seen_urls.add(href)
+            
+            if not self._is_article_url(href):
+                continue
+            
+            title = ' '.join(link.text_content().split())
+            articles.append(href, title, self._extract_article_id(href))
         
-        print(f"[Scanner:{self.source.name}] HTML: Found {len(articles)} articles")
+        logger.info("[Scanner:%s] HTML: Found %d articles", self.source.name, len(articles))
         return articles
     
     async def check_exists(self, url: str) -> bool:
@@ -494,6 +899,8 @@ def create_scanner(source: SourceConfig) -> Scanner:
 
 # === CLI Test ===
 if __name__ == "__main__":
+    logging.basicConfig(level=get_config().system.log_level, format="%(message)s")
+    
     async def test():
         config = get_config()
         
@@ -516,7 +923,7 @@ if __name__ == "__main__":
             if articles:
                 print(f"  Sample: {articles[0].title[:50]}..." if articles[0].title else f"  URL: {articles[0].url}")
             print()
-            
-            await scanner.close()
+        
+        await close_shared_session()
     
     asyncio.run(test())
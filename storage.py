@@ -5,18 +5,25 @@ Status: 0=new, 1=picked, 2=archived, -1=discarded
 """
 
 import sqlite3
+import atexit
+import hashlib
 import json
-import aiohttp
-import aiofiles
-import asyncio
+import threading
+import time
+import zlib
 from pathlib import Path
-from datetime import datetime
-from typing import Optional, List, Dict, Any
-from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any, Tuple, Iterable, Iterator
+from dataclasses import dataclass
 from contextlib import contextmanager
 
 from config import get_config, ensure_directories
 
+try:
+    import orjson  # optional: much faster JSON export
+except ImportError:
+    orjson = None
+
 
 # Status constants
 STATUS_NEW = 0        # Fresh from scanner, untouched
@@ -24,8 +31,34 @@ STATUS_PICKED = 1     # In Reading Box
 STATUS_ARCHIVED = 2   # Saved permanently
 STATUS_DISCARDED = -1 # Thrown away
 
+# Applied once per connection (connections are long-lived).
+# busy_timeout goes first so the rest waits out a concurrent writer;
+# mmap lets page reads skip the read() copy, temp_store keeps sort scratch in RAM.
+_PRAGMAS = '''
+    PRAGMA busy_timeout=5000;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA mmap_size=268435456;
+    PRAGMA cache_size=-65536;
+'''
+# Writer only: WAL lets readers run alongside the single writer (GUI + Crawler);
+# nothing closes the connection, so the autocheckpoint is what bounds the WAL.
+# recursive_triggers makes INSERT OR REPLACE fire the FTS delete trigger.
+_WRITER_PRAGMAS = '''
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA wal_autocheckpoint=1000;
+    PRAGMA recursive_triggers=ON;
+'''
 
-@dataclass
+# Columns added after the first release, applied only when missing.
+_ARTICLE_MIGRATIONS = (
+    ("status", "INTEGER DEFAULT 0"),
+    ("link_alive", "INTEGER DEFAULT 1"),
+    ("content_html_z", "BLOB"),
+)
+
+
+@dataclass(slots=True)
 class Article:
     """Article with triage status."""
     id: str
@@ -44,19 +77,148 @@ class Article:
     link_alive: bool = True   # Is original link still alive?
     category: str = ""
     
-    def to_dict(self) -> Dict[str, Any]:
-        d = asdict(self)
-        d['images'] = json.dumps(self.images)
-        return d
+    def to_dict(self, encode_images: bool = True) -> Dict[str, Any]:
+        """Field dict (images JSON-encoded for the DB unless encode_images=False)."""
+        # Built by hand: asdict() deep-copies every field, including content_html
+        return {
+            'id': self.id,
+            'source': self.source,
+            'source_name': self.source_name,
+            'url': self.url,
+            'title': self.title,
+            'sapo': self.sapo,
+            'author': self.author,
+            'content_text': self.content_text,
+            'content_html': self.content_html,
+            'images': json.dumps(self.images) if encode_images else list(self.images),
+            'published_at': self.published_at,
+            'crawled_at': self.crawled_at,
+            'status': self.status,
+            'link_alive': self.link_alive,
+            'category': self.category,
+        }
     
     @classmethod
     def from_row(cls, row: sqlite3.Row) -> 'Article':
         data = dict(row)
-        data['images'] = json.loads(data.get('images', '[]'))
+        html_z = data.pop('content_html_z', None)
+        if html_z:
+            data['content_html'] = _decompress_html(html_z)
+        images = data.get('images')
+        data['images'] = json.loads(images) if images and images != '[]' else []
         data['link_alive'] = bool(data.get('link_alive', 1))
         return cls(**data)
 
 
+# content_html is stored zlib-compressed in content_html_z (HTML shrinks ~4-5x);
+# tiny pages are not worth it and stay in the plain column
+_HTML_COMPRESS_MIN = 512
+
+
+def _compress_html(content_html: str) -> Optional[bytes]:
+    if len(content_html) < _HTML_COMPRESS_MIN:
+        return None
+    return zlib.compress(content_html.encode('utf-8'), 6)
+
+
+def _decompress_html(html_z: bytes) -> str:
+    return zlib.decompress(html_z).decode('utf-8')
+
+
+def _image_id(article_id: str, image_url: str) -> str:
+    """Stable 16-hex-char image ID (not security relevant; blake2b beats md5)."""
+    return hashlib.blake2b(f"{article_id}_{image_url}".encode(), digest_size=8).hexdigest()
+
+
+def _url_hash(url: str) -> int:
+    """Signed 64-bit URL fingerprint: the seen_urls key (fits SQLite INTEGER)."""
+    return int.from_bytes(
+        hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'little', signed=True
+    )
+
+
+class _UrlBloom:
+    """
+    Bloom filter over seen URL hashes: a miss means definitely unseen, a hit
+    still needs the DB to confirm (~1% false positives at capacity).
+    """
+    HASHES = 7
+    BITS_PER_URL = 10
+    
+    __slots__ = ('bits', 'size', 'capacity', 'count')
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.size = capacity * self.BITS_PER_URL
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+    
+    def _indexes(self, url_hash: int) -> List[int]:
+        # Kirsch-Mitzenmacher: k indexes from the two halves of the 64-bit hash
+        h1 = url_hash & 0xFFFFFFFF
+        h2 = ((url_hash >> 32) & 0xFFFFFFFF) | 1
+        return [(h1 + i * h2) % self.size for i in range(self.HASHES)]
+    
+    def add(self, url_hash: int):
+        bits = self.bits
+        flipped = False
+        for i in self._indexes(url_hash):
+            byte, mask = i >> 3, 1 << (i & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                flipped = True
+        # Re-adds of a present hash set no new bit: they must not inflate the load
+        if flipped:
+            self.count += 1
+    
+    def __contains__(self, url_hash: int) -> bool:
+        bits = self.bits
+        return all(bits[i >> 3] & (1 << (i & 7)) for i in self._indexes(url_hash))
+
+
+def _dump_json_array(path: str, items: Iterable[Dict[str, Any]]) -> int:
+    """
+    Stream items to a UTF-8 JSON array, one object per line (orjson when
+    installed), so memory stays flat however many items there are.
+    Returns the number of items written.
+    """
+    count = 0
+    with open(path, 'wb') as f:
+        f.write(b'[')
+        for item in items:
+            if orjson is not None:
+                line = orjson.dumps(item)
+            else:
+                line = json.dumps(item, ensure_ascii=False).encode('utf-8')
+            f.write(b'\n' if not count else b',\n')
+            f.write(line)
+            count += 1
+        f.write(b'\n]\n')
+    return count
+
+
+@dataclass(slots=True)
+class ArticleSummary:
+    """Display fields of an article for list views (no content columns)."""
+    id: str
+    source_name: str
+    url: str
+    title: str
+    sapo: str
+    author: str
+    published_at: str
+    crawled_at: str
+    status: int
+    link_alive: bool
+    category: str
+    
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> 'ArticleSummary':
+        data = dict(row)
+        data['link_alive'] = bool(data['link_alive'])
+        return cls(**data)
+
+
 @dataclass
 class ScanState:
     """Checkpoint for disaster recovery."""
@@ -67,6 +229,68 @@ class ScanState:
     articles_count: int
 
 
+# === SQL ===
+# Hot-path statements are fixed module-level strings so each connection's
+# statement cache (cached_statements) always hits instead of re-parsing.
+_ARTICLE_COLUMNS = tuple(Article.__dataclass_fields__)
+
+_SQL_LIST_BY_STATUS = """SELECT * FROM articles 
+                         WHERE status = ? 
+                         ORDER BY crawled_at DESC LIMIT ?"""
+_SQL_SUMMARY_BY_STATUS = f"""SELECT {', '.join(ArticleSummary.__dataclass_fields__)}
+                            FROM articles 
+                            WHERE status = ? 
+                            ORDER BY crawled_at DESC LIMIT ?"""
+_SQL_SEARCH_FTS = f"""SELECT {', '.join('a.' + c for c in ArticleSummary.__dataclass_fields__)}
+                     FROM articles_fts
+                     JOIN articles a ON a.rowid = articles_fts.rowid
+                     WHERE articles_fts MATCH ?
+                     ORDER BY bm25(articles_fts, 10.0, 5.0, 1.0)
+                     LIMIT ?"""
+_SQL_SEARCH_LIKE = f"""SELECT {', '.join(ArticleSummary.__dataclass_fields__)}
+                      FROM articles 
+                      WHERE title LIKE ? OR content_text LIKE ?
+                      ORDER BY crawled_at DESC LIMIT ?"""
+_SQL_GET_ARTICLE = "SELECT * FROM articles WHERE id = ?"
+_SQL_GET_ARTICLE_BY_URL = "SELECT * FROM articles WHERE url = ?"
+# UPSERT updates a re-captured article in place and keeps its triage status
+# (INSERT OR REPLACE deleted the row, resetting status to new)
+_UPSERT_SET = '''
+    title = excluded.title, sapo = excluded.sapo, author = excluded.author,
+    content_text = excluded.content_text, content_html = excluded.content_html,
+    content_html_z = excluded.content_html_z, images = excluded.images,
+    published_at = excluded.published_at, crawled_at = excluded.crawled_at,
+    link_alive = excluded.link_alive, category = excluded.category
+'''
+_SQL_SAVE_ARTICLE = (
+    f"INSERT INTO articles ({', '.join(_ARTICLE_COLUMNS)}, content_html_z) "
+    f"VALUES ({', '.join('?' * (len(_ARTICLE_COLUMNS) + 1))}) "
+    f"ON CONFLICT(url) DO UPDATE SET {_UPSERT_SET} "
+    f"ON CONFLICT(id) DO UPDATE SET url = excluded.url, {_UPSERT_SET}"
+)
+_SQL_SET_STATUS = "UPDATE articles SET status = ? WHERE id = ?"
+_SQL_SET_LINK_ALIVE = "UPDATE articles SET link_alive = ? WHERE url = ?"
+
+_SQL_IS_SEEN = "SELECT 1 FROM seen_urls WHERE url_hash = ?"
+_SQL_MARK_SEEN = "INSERT OR IGNORE INTO seen_urls VALUES (?, ?, ?, ?, ?)"
+_SQL_STAGE_URL = "INSERT OR IGNORE INTO batch_urls VALUES (?, ?)"
+_SQL_SEEN_IN_BATCH = "SELECT b.url FROM batch_urls b JOIN seen_urls s USING (url_hash)"
+
+_SQL_SAVE_IMAGE = """
+    INSERT OR REPLACE INTO images (id, article_id, url, local_path, downloaded, created_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+# Buffered checkpoints carry the number of articles since the last flush
+_SQL_UPDATE_CHECKPOINT = '''
+    INSERT INTO scan_state VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(source_name) DO UPDATE SET
+        last_article_id = excluded.last_article_id,
+        last_article_url = excluded.last_article_url,
+        last_scan_time = excluded.last_scan_time,
+        articles_count = articles_count + excluded.articles_count
+'''
+
+
 class Storage:
     """SQLite storage with triage workflow support."""
     
@@ -74,15 +298,33 @@ class Storage:
         self.config = get_config()
         ensure_directories()
         self.db_path = self.config.storage.db_path
+        
+        # One read-write connection shared by all threads (writes serialize on
+        # _write_lock) plus one long-lived read-only connection per thread
+        self._writer: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.RLock()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self._generation = 0  # bumped by close() so threads reconnect
+        self._stats_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        
+        # In-memory front for seen_urls, built on first lookup
+        self._seen_bloom: Optional[_UrlBloom] = None
+        self._seen_bloom_lock = threading.Lock()
+        
+        # Checkpoints only matter on restart: buffer them, flush in batches
+        self._checkpoint_buffer: Dict[str, list] = {}
+        self._checkpoint_lock = threading.Lock()
+        self._checkpoint_last_flush = time.monotonic()
+        atexit.register(self.flush_checkpoints)
+        
         self._init_db()
+        self._schedule_optimize()
     
     def _init_db(self):
         """Initialize database with triage status support."""
-        with self._get_connection() as conn:
-            # Enable WAL mode for concurrent read/write (GUI + Crawler)
-            conn.execute("PRAGMA journal_mode=WAL;")
-            conn.execute("PRAGMA synchronous=NORMAL;")
-            
+        with self._get_writer(transaction=False) as conn:
             conn.executescript('''
                 -- Articles table with status
                 CREATE TABLE IF NOT EXISTS articles (
@@ -103,18 +345,24 @@ class Storage:
                     category TEXT
                 );
                 
-                CREATE INDEX IF NOT EXISTS idx_articles_status ON articles(status);
+                -- (status, crawled_at) serves the status lists and their sort order;
+                -- it also covers plain status lookups, so the old index is dropped
+                CREATE INDEX IF NOT EXISTS idx_articles_status_crawled ON articles(status, crawled_at DESC);
+                DROP INDEX IF EXISTS idx_articles_status;
                 CREATE INDEX IF NOT EXISTS idx_articles_crawled ON articles(crawled_at DESC);
                 CREATE INDEX IF NOT EXISTS idx_articles_source ON articles(source_name);
                 
                 -- Seen URLs for deduplication
                 CREATE TABLE IF NOT EXISTS seen_urls (
-                    url TEXT PRIMARY KEY,
+                    url_hash INTEGER PRIMARY KEY,  -- _url_hash(url), the rowid
+                    url TEXT NOT NULL,
                     article_id TEXT,
                     source_name TEXT,
                     first_seen_at TEXT NOT NULL
                 );
                 
+                CREATE INDEX IF NOT EXISTS idx_seen_urls_article ON seen_urls(article_id);
+                
                 -- Images table with article association
                 CREATE TABLE IF NOT EXISTS images (
                     id TEXT PRIMARY KEY,
@@ -149,12 +397,30 @@ class Storage:
             ''')
             
             # Add columns if not exist (migration)
-            try:
-                conn.execute("ALTER TABLE articles ADD COLUMN status INTEGER DEFAULT 0")
-            except: pass
-            try:
-                conn.execute("ALTER TABLE articles ADD COLUMN link_alive INTEGER DEFAULT 1")
-            except: pass
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(articles)")}
+            for name, decl in _ARTICLE_MIGRATIONS:
+                if name not in columns:
+                    conn.execute(f"ALTER TABLE articles ADD COLUMN {name} {decl}")
+            
+            # seen_urls used to be keyed by the URL text: rekey by its hash
+            seen_columns = {row[1] for row in conn.execute("PRAGMA table_info(seen_urls)")}
+            if 'url_hash' not in seen_columns:
+                conn.executescript('''
+                    BEGIN;
+                    ALTER TABLE seen_urls RENAME TO seen_urls_old;
+                    CREATE TABLE seen_urls (
+                        url_hash INTEGER PRIMARY KEY,
+                        url TEXT NOT NULL,
+                        article_id TEXT,
+                        source_name TEXT,
+                        first_seen_at TEXT NOT NULL
+                    );
+                    INSERT OR IGNORE INTO seen_urls
+                        SELECT url_hash(url), url, article_id, source_name, first_seen_at FROM seen_urls_old;
+                    DROP TABLE seen_urls_old;
+                    CREATE INDEX IF NOT EXISTS idx_seen_urls_article ON seen_urls(article_id);
+                    COMMIT;
+                ''')
             
             # FTS5 Full-Text Search (fast search)
             try:
@@ -167,36 +433,139 @@ class Storage:
                         content_rowid=rowid
                     )
                 ''')
+                
+                # External-content index: keep it in sync with articles via triggers
+                fresh = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'articles_fts_ai'"
+                ).fetchone() is None
+                conn.executescript('''
+                    CREATE TRIGGER IF NOT EXISTS articles_fts_ai AFTER INSERT ON articles BEGIN
+                        INSERT INTO articles_fts(rowid, title, sapo, content_text)
+                        VALUES (new.rowid, new.title, new.sapo, new.content_text);
+                    END;
+                    
+                    CREATE TRIGGER IF NOT EXISTS articles_fts_ad AFTER DELETE ON articles BEGIN
+                        INSERT INTO articles_fts(articles_fts, rowid, title, sapo, content_text)
+                        VALUES ('delete', old.rowid, old.title, old.sapo, old.content_text);
+                    END;
+                    
+                    -- Status/link changes leave the indexed text alone
+                    CREATE TRIGGER IF NOT EXISTS articles_fts_au AFTER UPDATE OF title, sapo, content_text ON articles BEGIN
+                        INSERT INTO articles_fts(articles_fts, rowid, title, sapo, content_text)
+                        VALUES ('delete', old.rowid, old.title, old.sapo, old.content_text);
+                        INSERT INTO articles_fts(rowid, title, sapo, content_text)
+                        VALUES (new.rowid, new.title, new.sapo, new.content_text);
+                    END;
+                ''')
+                if fresh:
+                    # Index the articles saved before the triggers existed
+                    conn.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
             except: pass
             
             conn.commit()
         print(f"[Storage] Initialized: {self.db_path}")
     
-    @contextmanager
-    def _get_connection(self):
-        conn = sqlite3.connect(str(self.db_path), timeout=10)
+    def _connect(self, readonly: bool) -> sqlite3.Connection:
+        if readonly:
+            target, uri = Path(self.db_path).resolve().as_uri() + "?mode=ro", True
+        else:
+            target, uri = str(self.db_path), False
+        conn = sqlite3.connect(
+            target, uri=uri, timeout=10, check_same_thread=False, cached_statements=512
+        )
         conn.row_factory = sqlite3.Row
+        conn.create_function("url_hash", 1, _url_hash, deterministic=True)
+        conn.executescript(_PRAGMAS if readonly else _PRAGMAS + _WRITER_PRAGMAS)
+        return conn
+    
+    @contextmanager
+    def _get_reader(self):
+        """This thread's read-only connection (never waits on the writer under WAL)."""
+        local = self._local
+        conn = getattr(local, 'conn', None)
+        if conn is None or local.generation != self._generation:
+            local.conn = conn = self._connect(readonly=True)
+            local.generation = self._generation
+            with self._lock:
+                # Drop connections left behind by finished threads
+                alive = {t.ident for t in threading.enumerate()}
+                for ident in [i for i in self._connections if i not in alive]:
+                    self._connections.pop(ident).close()
+                self._connections[threading.get_ident()] = conn
+        yield conn
+    
+    @contextmanager
+    def _get_writer(self, transaction: bool = True):
+        """
+        The single read-write connection, held exclusively for the block.
+        Runs the block in a BEGIN IMMEDIATE transaction (committed on success,
+        rolled back on error) unless transaction=False, e.g. for ATTACH.
+        """
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = self._connect(readonly=False)
+            conn = self._writer
+            if not transaction:
+                try:
+                    yield conn
+                except Exception:
+                    # The connection outlives this call: never leave it mid-transaction
+                    if conn.in_transaction:
+                        conn.rollback()
+                    raise
+                finally:
+                    self._stats_cache = None
+                return
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                self._stats_cache = None
+    
+    OPTIMIZE_INTERVAL = 900  # seconds between PRAGMA optimize runs
+    
+    def _schedule_optimize(self):
+        timer = threading.Timer(self.OPTIMIZE_INTERVAL, self._optimize)
+        timer.daemon = True
+        timer.start()
+    
+    def _optimize(self):
+        """Refresh query planner statistics, as SQLite recommends for long-lived connections."""
         try:
-            yield conn
-        finally:
-            conn.close()
+            with self._get_writer(transaction=False) as conn:
+                conn.execute("PRAGMA optimize")
+        except sqlite3.Error as e:
+            print(f"[Storage] Optimize error: {e}")
+        self._schedule_optimize()
+    
+    def close(self):
+        """Close all connections; they reopen lazily on next use."""
+        self.flush_checkpoints()
+        with self._write_lock, self._lock:
+            self._generation += 1
+            for conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        self._seen_bloom = None  # the file may be swapped; rebuild from it
     
     # === TRIAGE WORKFLOW ===
     
     def get_stream(self, limit: int = 100) -> List[Article]:
         """Get new articles (status=0) for The Stream."""
-        with self._get_connection() as conn:
-            cursor = conn.execute(
-                """SELECT * FROM articles 
-                   WHERE status = ? 
-                   ORDER BY crawled_at DESC LIMIT ?""",
-                (STATUS_NEW, limit)
-            )
+        with self._get_reader() as conn:
+            cursor = conn.execute(_SQL_LIST_BY_STATUS, (STATUS_NEW, limit))
             return [Article.from_row(row) for row in cursor.fetchall()]
     
     def get_picked(self) -> List[Article]:
         """Get picked articles (status=1) for Reading Box."""
-        with self._get_connection() as conn:
+        with self._get_reader() as conn:
             cursor = conn.execute(
                 """SELECT * FROM articles 
                    WHERE status = ? 
@@ -207,167 +576,259 @@ class Storage:
     
     def get_archived(self, limit: int = 500) -> List[Article]:
         """Get archived articles (status=2)."""
-        with self._get_connection() as conn:
-            cursor = conn.execute(
-                """SELECT * FROM articles 
-                   WHERE status = ? 
-                   ORDER BY crawled_at DESC LIMIT ?""",
-                (STATUS_ARCHIVED, limit)
-            )
+        with self._get_reader() as conn:
+            cursor = conn.execute(_SQL_LIST_BY_STATUS, (STATUS_ARCHIVED, limit))
             return [Article.from_row(row) for row in cursor.fetchall()]
     
+    # List views only need display fields: these skip content_text/content_html
+    
+    def _get_summaries(self, status: int, limit: int) -> List[ArticleSummary]:
+        with self._get_reader() as conn:
+            cursor = conn.execute(_SQL_SUMMARY_BY_STATUS, (status, limit))
+            return [ArticleSummary.from_row(row) for row in cursor.fetchall()]
+    
+    def get_stream_summary(self, limit: int = 100) -> List[ArticleSummary]:
+        """get_stream() without content columns."""
+        return self._get_summaries(STATUS_NEW, limit)
+    
+    def get_picked_summary(self) -> List[ArticleSummary]:
+        """get_picked() without content columns."""
+        return self._get_summaries(STATUS_PICKED, -1)
+    
+    def get_archived_summary(self, limit: int = 500) -> List[ArticleSummary]:
+        """get_archived() without content columns."""
+        return self._get_summaries(STATUS_ARCHIVED, limit)
+    
+    def _set_status(self, article_ids: List[str], status: int) -> int:
+        """Set status for many articles in one transaction; returns rows changed."""
+        if not article_ids:
+            return 0
+        with self._get_writer() as conn:
+            cursor = conn.executemany(
+                _SQL_SET_STATUS, [(status, article_id) for article_id in article_ids]
+            )
+            return cursor.rowcount
+    
     def pick_article(self, article_id: str) -> bool:
         """Move article to Reading Box (status=1)."""
-        with self._get_connection() as conn:
-            cursor = conn.execute(
-                "UPDATE articles SET status = ? WHERE id = ?",
-                (STATUS_PICKED, article_id)
-            )
-            conn.commit()
-            return cursor.rowcount > 0
+        return self._set_status([article_id], STATUS_PICKED) > 0
     
     def archive_article(self, article_id: str) -> bool:
         """Save article permanently (status=2)."""
-        with self._get_connection() as conn:
-            cursor = conn.execute(
-                "UPDATE articles SET status = ? WHERE id = ?",
-                (STATUS_ARCHIVED, article_id)
-            )
-            conn.commit()
-            return cursor.rowcount > 0
+        return self._set_status([article_id], STATUS_ARCHIVED) > 0
     
     def discard_article(self, article_id: str) -> bool:
         """Discard article (status=-1)."""
-        with self._get_connection() as conn:
-            cursor = conn.execute(
-                "UPDATE articles SET status = ? WHERE id = ?",
-                (STATUS_DISCARDED, article_id)
-            )
-            conn.commit()
-            return cursor.rowcount > 0
+        return self._set_status([article_id], STATUS_DISCARDED) > 0
     
     def unpick_article(self, article_id: str) -> bool:
         """Return article to stream (status=0)."""
-        with self._get_connection() as conn:
-            cursor = conn.execute(
-                "UPDATE articles SET status = ? WHERE id = ?",
-                (STATUS_NEW, article_id)
-            )
-            conn.commit()
-            return cursor.rowcount > 0
+        return self._set_status([article_id], STATUS_NEW) > 0
+    
+    def pick_articles(self, article_ids: List[str]) -> int:
+        """Bulk pick_article (single commit)."""
+        return self._set_status(article_ids, STATUS_PICKED)
+    
+    def archive_articles(self, article_ids: List[str]) -> int:
+        """Bulk archive_article (single commit)."""
+        return self._set_status(article_ids, STATUS_ARCHIVED)
+    
+    def discard_articles(self, article_ids: List[str]) -> int:
+        """Bulk discard_article (single commit)."""
+        return self._set_status(article_ids, STATUS_DISCARDED)
+    
+    def unpick_articles(self, article_ids: List[str]) -> int:
+        """Bulk unpick_article (single commit)."""
+        return self._set_status(article_ids, STATUS_NEW)
     
     def update_link_status(self, url: str, alive: bool) -> bool:
         """Update link alive status."""
-        with self._get_connection() as conn:
-            cursor = conn.execute(
-                "UPDATE articles SET link_alive = ? WHERE url = ?",
-                (1 if alive else 0, url)
-            )
-            conn.commit()
+        with self._get_writer() as conn:
+            cursor = conn.execute(_SQL_SET_LINK_ALIVE, (1 if alive else 0, url))
             return cursor.rowcount > 0
     
     # === DEDUPLICATION ===
     
+    BLOOM_MIN_CAPACITY = 100_000
+    
+    def _get_seen_bloom(self) -> _UrlBloom:
+        """Bloom filter of seen_urls, rebuilt (2x headroom) once it fills up."""
+        bloom = self._seen_bloom
+        if bloom is not None and bloom.count <= bloom.capacity:
+            return bloom
+        with self._seen_bloom_lock:
+            bloom = self._seen_bloom
+            if bloom is None or bloom.count > bloom.capacity:
+                with self._get_reader() as conn:
+                    hashes = [row[0] for row in conn.execute("SELECT url_hash FROM seen_urls")]
+                bloom = _UrlBloom(max(2 * len(hashes), self.BLOOM_MIN_CAPACITY))
+                for url_hash in hashes:
+                    bloom.add(url_hash)
+                self._seen_bloom = bloom
+            return bloom
+    
+    def _remember_seen(self, hashes: Iterable[int]):
+        """Add freshly committed URL hashes to the Bloom filter (if it is built yet)."""
+        with self._seen_bloom_lock:
+            bloom = self._seen_bloom
+            if bloom is not None:
+                for url_hash in hashes:
+                    bloom.add(url_hash)
+    
+    def seen_filter_ready(self) -> bool:
+        """Whether the Bloom filter is built, i.e. is_probably_seen() runs no SQL."""
+        bloom = self._seen_bloom
+        return bloom is not None and bloom.count <= bloom.capacity
+    
+    def warm_seen_filter(self):
+        """Build the Bloom filter now (blocking: full scan of seen_urls)."""
+        self._get_seen_bloom()
+    
+    def is_probably_seen(self, url: str) -> bool:
+        """Bloom-only check (no SQL once built): False means definitely new."""
+        return _url_hash(url) in self._get_seen_bloom()
+    
     def is_seen(self, url: str) -> bool:
-        with self._get_connection() as conn:
-            cursor = conn.execute(
-                "SELECT 1 FROM seen_urls WHERE url = ? LIMIT 1", (url,)
-            )
+        url_hash = _url_hash(url)
+        if url_hash not in self._get_seen_bloom():
+            return False
+        with self._get_reader() as conn:
+            cursor = conn.execute(_SQL_IS_SEEN, (url_hash,))
             return cursor.fetchone() is not None
     
     def mark_seen(self, url: str, article_id: str, source_name: str):
-        with self._get_connection() as conn:
-            conn.execute(
-                "INSERT OR IGNORE INTO seen_urls VALUES (?, ?, ?, ?)",
-                (url, article_id, source_name, datetime.utcnow().isoformat())
-            )
-            conn.commit()
+        self.mark_seen_bulk([(url, article_id, source_name)])
+    
+    def mark_seen_bulk(self, entries: List[Tuple[str, str, str]]):
+        """Mark many (url, article_id, source_name) entries seen in one commit."""
+        if not entries:
+            return
+        now = datetime.utcnow().isoformat()
+        rows = [
+            (_url_hash(url), url, article_id, source_name, now)
+            for url, article_id, source_name in entries
+        ]
+        with self._get_writer() as conn:
+            conn.executemany(_SQL_MARK_SEEN, rows)
+        self._remember_seen(row[0] for row in rows)
     
     def filter_new_urls(self, urls: List[str]) -> List[str]:
         if not urls:
             return []
-        with self._get_connection() as conn:
-            placeholders = ','.join('?' * len(urls))
-            cursor = conn.execute(
-                f"SELECT url FROM seen_urls WHERE url IN ({placeholders})", urls
+        # Bloom misses are new for sure; only the hits need the DB
+        bloom = self._get_seen_bloom()
+        maybe_seen = [(h, url) for url in urls if (h := _url_hash(url)) in bloom]
+        if not maybe_seen:
+            return list(urls)
+        # Stage the batch in a temp table and join, instead of an IN (?,?,...)
+        # list that grows with the batch and hits SQLite's parameter limit
+        with self._get_reader() as conn:
+            conn.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS batch_urls (url_hash INTEGER PRIMARY KEY, url TEXT)"
             )
-            seen = {row['url'] for row in cursor.fetchall()}
+            try:
+                conn.executemany(_SQL_STAGE_URL, maybe_seen)
+                cursor = conn.execute(_SQL_SEEN_IN_BATCH)
+                seen = {row['url'] for row in cursor.fetchall()}
+            finally:
+                conn.rollback()  # staged rows only live for this call
         return [url for url in urls if url not in seen]
     
     # === ARTICLE CRUD ===
     
     def save_article(self, article: Article) -> bool:
         """Save article with status=new (0)."""
+        return self.save_articles_bulk([article])[0]
+    
+    def save_articles_bulk(self, articles: List[Article]) -> List[bool]:
+        """Save many articles in one commit; returns per-article success."""
+        # Serialize + compress before taking the write lock
+        rows, hashes = [], []
+        for article in articles:
+            # to_dict() yields the fields in _ARTICLE_COLUMNS order
+            data = article.to_dict()
+            html_z = _compress_html(data['content_html'])
+            if html_z is not None:
+                data['content_html'] = ''
+            rows.append([*data.values(), html_z])
+            hashes.append(_url_hash(article.url))
+        
+        results, fresh = [], []
         try:
-            with self._get_connection() as conn:
-                data = article.to_dict()
-                columns = ', '.join(data.keys())
-                placeholders = ', '.join('?' * len(data))
-                
-                conn.execute(
-                    f"INSERT OR REPLACE INTO articles ({columns}) VALUES ({placeholders})",
-                    list(data.values())
-                )
-                conn.execute(
-                    "INSERT OR IGNORE INTO seen_urls VALUES (?, ?, ?, ?)",
-                    (article.url, article.id, article.source_name, article.crawled_at)
-                )
-                conn.commit()
-            return True
+            with self._get_writer() as conn:
+                for article, row, url_hash in zip(articles, rows, hashes):
+                    try:
+                        conn.execute(_SQL_SAVE_ARTICLE, row)
+                        cursor = conn.execute(
+                            _SQL_MARK_SEEN,
+                            (url_hash, article.url, article.id, article.source_name, article.crawled_at)
+                        )
+                        results.append(True)
+                        # Re-saves (URL already seen) update the row but are not progress
+                        if cursor.rowcount == 1:
+                            fresh.append(article)
+                    except sqlite3.Error as e:
+                        # A failed statement leaves the rest of the batch intact
+                        print(f"[Storage] Save error: {e}")
+                        results.append(False)
         except Exception as e:
             print(f"[Storage] Save error: {e}")
-            return False
+            return [False] * len(articles)
+        
+        self._remember_seen(h for h, ok in zip(hashes, results) if ok)
+        
+        # Per-source recovery checkpoint for newly seen URLs: buffered, flushed in batches
+        for article in fresh:
+            self.update_checkpoint(article.source_name, article.id, article.url)
+        return results
     
     def get_article(self, article_id: str) -> Optional[Article]:
-        with self._get_connection() as conn:
-            cursor = conn.execute(
-                "SELECT * FROM articles WHERE id = ?", (article_id,)
-            )
+        with self._get_reader() as conn:
+            cursor = conn.execute(_SQL_GET_ARTICLE, (article_id,))
             row = cursor.fetchone()
             return Article.from_row(row) if row else None
     
     def get_article_by_url(self, url: str) -> Optional[Article]:
-        with self._get_connection() as conn:
-            cursor = conn.execute(
-                "SELECT * FROM articles WHERE url = ?", (url,)
-            )
+        with self._get_reader() as conn:
+            cursor = conn.execute(_SQL_GET_ARTICLE_BY_URL, (url,))
             row = cursor.fetchone()
             return Article.from_row(row) if row else None
     
     def get_all_articles(self) -> List[Article]:
-        with self._get_connection() as conn:
-            cursor = conn.execute(
-                "SELECT * FROM articles ORDER BY crawled_at DESC"
-            )
-            return [Article.from_row(row) for row in cursor.fetchall()]
+        return list(self.iter_articles())
     
-    def search_articles(self, keyword: str, limit: int = 100) -> List[Article]:
-        """Fast full-text search using FTS5."""
-        with self._get_connection() as conn:
-            try:
-                # Try FTS5 first (much faster)
+    def iter_articles(self, status: Optional[int] = None, limit: int = -1) -> Iterator[Article]:
+        """Yield articles newest first, one row at a time (no fetchall)."""
+        with self._get_reader() as conn:
+            if status is None:
                 cursor = conn.execute(
-                    """SELECT articles.* FROM articles
-                       JOIN articles_fts ON articles.rowid = articles_fts.rowid
-                       WHERE articles_fts MATCH ?
-                       ORDER BY rank
-                       LIMIT ?""",
-                    (keyword, limit)
+                    "SELECT * FROM articles ORDER BY crawled_at DESC LIMIT ?", (limit,)
                 )
-            except:
+            else:
+                cursor = conn.execute(_SQL_LIST_BY_STATUS, (status, limit))
+            for row in cursor:
+                yield Article.from_row(row)
+    
+    def search_articles(self, keyword: str, limit: int = 100) -> List[ArticleSummary]:
+        """Fast full-text search using FTS5 (title > sapo > content), summaries only."""
+        # Quote each word so user input can never be FTS5 query syntax
+        query = ' '.join('"' + word.replace('"', '""') + '"' for word in keyword.split())
+        if not query:
+            return []
+        with self._get_reader() as conn:
+            try:
+                # Try FTS5 first (much faster)
+                cursor = conn.execute(_SQL_SEARCH_FTS, (query, limit))
+            except sqlite3.Error:
                 # Fallback to LIKE if FTS5 not available
-                cursor = conn.execute(
-                    """SELECT * FROM articles 
-                       WHERE title LIKE ? OR content_text LIKE ?
-                       ORDER BY crawled_at DESC LIMIT ?""",
-                    (f'%{keyword}%', f'%{keyword}%', limit)
-                )
-            return [Article.from_row(row) for row in cursor.fetchall()]
+                cursor = conn.execute(_SQL_SEARCH_LIKE, (f'%{keyword}%', f'%{keyword}%', limit))
+            return [ArticleSummary.from_row(row) for row in cursor.fetchall()]
     
     # === CHECKPOINT ===
     
     def get_checkpoint(self, source_name: str) -> Optional[ScanState]:
-        with self._get_connection() as conn:
+        self.flush_checkpoints()
+        with self._get_reader() as conn:
             cursor = conn.execute(
                 "SELECT * FROM scan_state WHERE source_name = ?", (source_name,)
             )
@@ -376,36 +837,57 @@ class Storage:
                 return ScanState(**dict(row))
         return None
     
+    CHECKPOINT_FLUSH_COUNT = 20     # buffered updates before a flush
+    CHECKPOINT_FLUSH_INTERVAL = 5.0  # seconds before a flush
+    
     def update_checkpoint(self, source_name: str, article_id: str, url: str):
-        with self._get_connection() as conn:
-            conn.execute('''
-                INSERT INTO scan_state VALUES (?, ?, ?, ?, 1)
-                ON CONFLICT(source_name) DO UPDATE SET
-                    last_article_id = excluded.last_article_id,
-                    last_article_url = excluded.last_article_url,
-                    last_scan_time = excluded.last_scan_time,
-                    articles_count = articles_count + 1
-            ''', (source_name, article_id, url, datetime.utcnow().isoformat()))
-            conn.commit()
+        with self._checkpoint_lock:
+            entry = self._checkpoint_buffer.get(source_name)
+            count = entry[4] + 1 if entry else 1
+            self._checkpoint_buffer[source_name] = [
+                source_name, article_id, url, datetime.utcnow().isoformat(), count
+            ]
+            pending = sum(e[4] for e in self._checkpoint_buffer.values())
+            due = (pending >= self.CHECKPOINT_FLUSH_COUNT or
+                   time.monotonic() - self._checkpoint_last_flush >= self.CHECKPOINT_FLUSH_INTERVAL)
+        if due:
+            self.flush_checkpoints()
+    
+    def flush_checkpoints(self):
+        """Write buffered checkpoints (one transaction for all sources)."""
+        with self._checkpoint_lock:
+            rows = list(self._checkpoint_buffer.values())
+            self._checkpoint_buffer.clear()
+            self._checkpoint_last_flush = time.monotonic()
+        if rows:
+            with self._get_writer() as conn:
+                conn.executemany(_SQL_UPDATE_CHECKPOINT, rows)
     
     # === STATS ===
     
+    STATS_TTL = 2.0  # seconds; GUI polls get_stats, writes invalidate it
+    
     def get_stats(self) -> Dict[str, Any]:
-        with self._get_connection() as conn:
-            total = conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
-            new = conn.execute("SELECT COUNT(*) FROM articles WHERE status=0").fetchone()[0]
-            picked = conn.execute("SELECT COUNT(*) FROM articles WHERE status=1").fetchone()[0]
-            archived = conn.execute("SELECT COUNT(*) FROM articles WHERE status=2").fetchone()[0]
-            discarded = conn.execute("SELECT COUNT(*) FROM articles WHERE status=-1").fetchone()[0]
-            dead_links = conn.execute("SELECT COUNT(*) FROM articles WHERE link_alive=0").fetchone()[0]
-            
-            today = datetime.utcnow().strftime('%Y-%m-%d')
-            today_count = conn.execute(
-                "SELECT COUNT(*) FROM articles WHERE crawled_at LIKE ?",
-                (f'{today}%',)
-            ).fetchone()[0]
+        cached = self._stats_cache
+        if cached and time.monotonic() - cached[0] < self.STATS_TTL:
+            return cached[1]
         
-        return {
+        now = datetime.utcnow()
+        today = now.strftime('%Y-%m-%d')
+        tomorrow = (now + timedelta(days=1)).strftime('%Y-%m-%d')
+        with self._get_reader() as conn:
+            # One pass with conditional aggregation instead of a COUNT per status;
+            # "today" is a plain string range (LIKE is case-insensitive pattern matching)
+            row = conn.execute("""
+                SELECT COUNT(*),
+                       SUM(status = 0), SUM(status = 1), SUM(status = 2), SUM(status = -1),
+                       SUM(link_alive = 0),
+                       SUM(crawled_at >= ? AND crawled_at < ?)
+                FROM articles
+            """, (today, tomorrow)).fetchone()
+        total, new, picked, archived, discarded, dead_links, today_count = (v or 0 for v in row)
+        
+        stats = {
             'total': total,
             'new': new,
             'picked': picked,
@@ -415,21 +897,11 @@ class Storage:
             'today': today_count,
             'db_size_mb': round(self.db_path.stat().st_size / 1024 / 1024, 2) if self.db_path.exists() else 0
         }
+        self._stats_cache = (time.monotonic(), stats)
+        return stats
     
     # === EXPORT ===
     
-    def export_json(self, path: str, status: Optional[int] = STATUS_ARCHIVED):
-        """Export articles (default: archived only)."""
-        if status is not None:
-            articles = self.get_archived() if status == STATUS_ARCHIVED else self.get_stream()
-        else:
-            articles = self.get_all_articles()
-        
-        data = [asdict(a) for a in articles]
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"[Storage] Exported {len(articles)} articles to {path}")
-    
     def export_html(self, article_id: str, path: str):
         """Export single article to HTML."""
         article = self.get_article(article_id)
@@ -480,24 +952,38 @@ class Storage:
     
     def save_image(self, article_id: str, image_url: str, local_path: str = None) -> str:
         """Save image record linked to article."""
-        import hashlib
-        image_id = hashlib.md5(f"{article_id}_{image_url}".encode()).hexdigest()[:16]
-        
-        with self._get_connection() as conn:
-            conn.execute("""
-                INSERT OR REPLACE INTO images (id, article_id, url, local_path, downloaded, created_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                image_id, article_id, image_url, 
+        return self.save_images_bulk(article_id, [(image_url, local_path)])[0]
+    
+    def save_images_bulk(self, article_id: str, images: List[Tuple[str, Optional[str]]]) -> List[str]:
+        """Save many (image_url, local_path) records for one article in one commit."""
+        now = datetime.utcnow().isoformat()
+        rows = [
+            (
+                _image_id(article_id, image_url),
+                article_id, image_url,
                 local_path, 1 if local_path else 0,
-                datetime.utcnow().isoformat()
-            ))
-            conn.commit()
-        return image_id
+                now
+            )
+            for image_url, local_path in images
+        ]
+        
+        if rows:
+            with self._get_writer() as conn:
+                conn.executemany(_SQL_SAVE_IMAGE, rows)
+        return [row[0] for row in rows]
+    
+    def get_article_image_urls(self, article_id: str) -> List[str]:
+        """Image URLs from the article's JSON images column (unpacked by SQLite's json_each)."""
+        with self._get_reader() as conn:
+            cursor = conn.execute(
+                "SELECT value FROM articles, json_each(articles.images) WHERE articles.id = ?",
+                (article_id,)
+            )
+            return [row[0] for row in cursor.fetchall()]
     
     def get_article_images(self, article_id: str) -> List[dict]:
         """Get all images for an article."""
-        with self._get_connection() as conn:
+        with self._get_reader() as conn:
             cursor = conn.execute(
                 "SELECT * FROM images WHERE article_id = ?", (article_id,)
             )
@@ -505,7 +991,7 @@ class Storage:
     
     def get_image(self, image_id: str) -> Optional[dict]:
         """Get single image by ID."""
-        with self._get_connection() as conn:
+        with self._get_reader() as conn:
             cursor = conn.execute(
                 "SELECT * FROM images WHERE id = ?", (image_id,)
             )
@@ -514,16 +1000,15 @@ class Storage:
     
     def mark_image_downloaded(self, image_id: str, local_path: str):
         """Mark image as downloaded with local path."""
-        with self._get_connection() as conn:
+        with self._get_writer() as conn:
             conn.execute(
                 "UPDATE images SET downloaded = 1, local_path = ? WHERE id = ?",
                 (local_path, image_id)
             )
-            conn.commit()
     
     def get_pending_images(self, limit: int = 100) -> List[dict]:
         """Get images that haven't been downloaded yet."""
-        with self._get_connection() as conn:
+        with self._get_reader() as conn:
             cursor = conn.execute(
                 "SELECT * FROM images WHERE downloaded = 0 LIMIT ?", (limit,)
             )
@@ -533,37 +1018,41 @@ class Storage:
     
     def export_full_db(self, output_path: str):
         """Export entire database to SQLite backup file."""
-        import shutil
-        from pathlib import Path
-        
         # Ensure .db extension
         if not output_path.endswith('.db'):
             output_path = output_path.replace('.json', '.db')
             if not output_path.endswith('.db'):
                 output_path += '.db'
         
-        # Copy the DB file directly (fastest and preserves everything)
-        shutil.copy2(str(self.db_path), output_path)
-        
-        # Get stats for reporting
-        with self._get_connection() as conn:
-            articles = conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
-            images = conn.execute("SELECT COUNT(*) FROM images").fetchone()[0]
+        # Online backup API: a consistent snapshot including un-checkpointed WAL
+        # frames, copied from this thread's reader so writers are not blocked.
+        # One step (pages=-1): a stepped copy restarts whenever the writer commits.
+        dst = sqlite3.connect(output_path)
+        try:
+            with self._get_reader() as conn:
+                conn.backup(dst, pages=-1)
+            
+            # Get stats for reporting (from the snapshot itself)
+            articles = dst.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+            images = dst.execute("SELECT COUNT(*) FROM images").fetchone()[0]
+        finally:
+            dst.close()
         
         print(f"[Storage] DB exported: {articles} articles, {images} images -> {output_path}")
         return {'articles': articles, 'images': images, 'path': output_path}
     
     def export_json(self, path: str, status: Optional[int] = STATUS_ARCHIVED):
         """Export filtered articles to JSON."""
-        if status is not None:
-            articles = self.get_archived() if status == STATUS_ARCHIVED else self.get_stream()
+        # Same selection as get_archived() / get_stream(), streamed row by row
+        if status is None:
+            articles = self.iter_articles()
+        elif status == STATUS_ARCHIVED:
+            articles = self.iter_articles(STATUS_ARCHIVED, limit=500)
         else:
-            articles = self.get_all_articles()
+            articles = self.iter_articles(STATUS_NEW, limit=100)
         
-        data = [asdict(a) for a in articles]
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"[Storage] Exported {len(articles)} articles to {path}")
+        count = _dump_json_array(path, (a.to_dict(encode_images=False) for a in articles))
+        print(f"[Storage] Exported {count} articles to {path}")
     
     def import_db(self, input_path: str, merge: bool = True):
         """
@@ -573,38 +1062,51 @@ class Storage:
             input_path: Path to backup file
             merge: If True, merge with existing. If False, replace all.
         """
-        from pathlib import Path
         import shutil
         
         # Check if it's a SQLite DB file
         if input_path.endswith('.db'):
             if not merge:
-                # Replace: just copy the file
+                # Replace: just copy the file (open connections would keep the old one)
+                self.close()
                 shutil.copy2(input_path, str(self.db_path))
+                self._init_db()  # bring the imported file up to the current schema
                 print(f"[Storage] DB replaced from {input_path}")
                 return {'articles': '(replaced)', 'images': '(replaced)'}
             else:
                 # Merge: attach and copy data
-                with self._get_connection() as conn:
+                with self._get_writer(transaction=False) as conn:
+                    # ATTACH/DETACH are not allowed inside a transaction
                     conn.execute(f"ATTACH DATABASE '{input_path}' AS import_db")
-                    
-                    # Import articles
-                    conn.execute("""
-                        INSERT OR REPLACE INTO articles 
-                        SELECT * FROM import_db.articles
-                    """)
-                    
-                    # Import images
-                    conn.execute("""
-                        INSERT OR REPLACE INTO images 
-                        SELECT * FROM import_db.images
-                    """)
-                    
-                    conn.commit()  # Commit transaction BEFORE detach
-                    conn.execute("DETACH DATABASE import_db")
+                    try:
+                        conn.execute("BEGIN IMMEDIATE")
+                        
+                        # Import articles by column name: older backups may lack
+                        # content_html_z or have migrated columns in another order
+                        ours = {row['name'] for row in conn.execute("PRAGMA main.table_info(articles)")}
+                        cols = ', '.join(
+                            row['name'] for row in conn.execute("PRAGMA import_db.table_info(articles)")
+                            if row['name'] in ours
+                        )
+                        conn.execute(f"""
+                            INSERT OR REPLACE INTO articles ({cols})
+                            SELECT {cols} FROM import_db.articles
+                        """)
+                        
+                        # Import images
+                        conn.execute("""
+                            INSERT OR REPLACE INTO images 
+                            SELECT * FROM import_db.images
+                        """)
+                        
+                        conn.commit()  # Commit transaction BEFORE detach
+                    except Exception:
+                        conn.rollback()
+                        raise
+                    finally:
+                        conn.execute("DETACH DATABASE import_db")
                 
-                # Re-connect to get fresh stats avoiding any lingering state
-                with self._get_connection() as conn:
+                with self._get_reader() as conn:
                     articles = conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
                     images = conn.execute("SELECT COUNT(*) FROM images").fetchone()[0]
                 
@@ -617,59 +1119,61 @@ class Storage:
         
         imported = {'articles': 0, 'images': 0}
         
-        with self._get_connection() as conn:
+        with self._get_writer() as conn:
             if not merge:
                 # Clear existing data
                 conn.execute("DELETE FROM articles")
                 conn.execute("DELETE FROM images")
                 conn.execute("DELETE FROM seen_urls")
             
-            # Import articles
-            for article in data.get('articles', []):
-                try:
-                    cols = ', '.join(article.keys())
-                    vals = ', '.join(['?' for _ in article])
-                    conn.execute(
-                        f"INSERT OR {'REPLACE' if merge else 'IGNORE'} INTO articles ({cols}) VALUES ({vals})",
-                        list(article.values())
-                    )
-                    
-                    # Also add to seen_urls
-                    conn.execute(
-                        "INSERT OR IGNORE INTO seen_urls VALUES (?, ?, ?, ?)",
-                        (article['url'], article['id'], article.get('source_name', ''), article.get('crawled_at', ''))
-                    )
-                    imported['articles'] += 1
-                except Exception as e:
-                    print(f"[Import] Article error: {e}")
+            conflict = 'REPLACE' if merge else 'IGNORE'
+            imported['articles'] = self._import_rows(conn, 'articles', data.get('articles', []), conflict, "Article")
             
-            # Import images
-            for image in data.get('images', []):
-                try:
-                    cols = ', '.join(image.keys())
-                    vals = ', '.join(['?' for _ in image])
-                    conn.execute(
-                        f"INSERT OR {'REPLACE' if merge else 'IGNORE'} INTO images ({cols}) VALUES ({vals})",
-                        list(image.values())
-                    )
-                    imported['images'] += 1
-                except Exception as e:
-                    print(f"[Import] Image error: {e}")
+            # Also add to seen_urls (every stored article, in one statement)
+            conn.execute("""
+                INSERT OR IGNORE INTO seen_urls
+                SELECT url_hash(url), url, id, source_name, crawled_at FROM articles
+            """)
             
-            conn.commit()
+            imported['images'] = self._import_rows(conn, 'images', data.get('images', []), conflict, "Image")
+        self._seen_bloom = None  # seen_urls gained rows behind the filter's back
         
         print(f"[Storage] Imported: {imported['articles']} articles, {imported['images']} images")
         return imported
     
+    @staticmethod
+    def _import_rows(conn, table: str, rows: List[dict], conflict: str, label: str) -> int:
+        """
+        Insert JSON rows with one executemany per distinct column set.
+        A failing group is retried row by row, so a bad row is skipped, not fatal.
+        """
+        groups: Dict[tuple, List[tuple]] = {}
+        for row in rows:
+            groups.setdefault(tuple(row), []).append(tuple(row.values()))
+        
+        imported = 0
+        for cols, values in groups.items():
+            sql = f"INSERT OR {conflict} INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})"
+            try:
+                conn.executemany(sql, values)
+                imported += len(values)
+            except sqlite3.Error:
+                for value in values:
+                    try:
+                        conn.execute(sql, value)
+                        imported += 1
+                    except sqlite3.Error as e:
+                        print(f"[Import] {label} error: {e}")
+        return imported
+    
     def clear_db(self):
         """Clear all data (use with caution!)."""
-        with self._get_connection() as conn:
+        with self._get_writer() as conn:
             conn.execute("DELETE FROM articles")
             conn.execute("DELETE FROM images")
             conn.execute("DELETE FROM seen_urls")
             conn.execute("DELETE FROM scan_state")
             conn.execute("DELETE FROM error_log")
-            conn.commit()
         print("[Storage] Database cleared!")
     
     def auto_prune(self, days: int = 7):
@@ -677,34 +1181,38 @@ class Storage:
         Automatically delete old discarded articles.
         Also deletes associated images from disk.
         """
-        from pathlib import Path
         import shutil
+        from concurrent.futures import ThreadPoolExecutor
         
-        cutoff = (datetime.utcnow() - __import__('datetime').timedelta(days=days)).isoformat()
+        cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
         
-        with self._get_connection() as conn:
-            # Get articles to delete
-            cursor = conn.execute(
-                "SELECT id FROM articles WHERE status = -1 AND crawled_at < ?",
+        with self._get_writer() as conn:
+            # Collect the victims in a temp table: the deletes join against it
+            # instead of binding one parameter per article
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS prune_ids (id TEXT PRIMARY KEY)")
+            conn.execute("DELETE FROM prune_ids")
+            conn.execute(
+                "INSERT INTO prune_ids SELECT id FROM articles WHERE status = -1 AND crawled_at < ?",
                 (cutoff,)
             )
-            article_ids = [row['id'] for row in cursor.fetchall()]
+            article_ids = [row['id'] for row in conn.execute("SELECT id FROM prune_ids")]
             
             if not article_ids:
                 return 0
             
-            # Delete images from disk
-            for article_id in article_ids:
-                img_dir = Path("data/images") / article_id
-                if img_dir.exists():
-                    shutil.rmtree(img_dir, ignore_errors=True)
-            
             # Delete from DB
-            placeholders = ','.join('?' * len(article_ids))
-            conn.execute(f"DELETE FROM images WHERE article_id IN ({placeholders})", article_ids)
-            conn.execute(f"DELETE FROM articles WHERE id IN ({placeholders})", article_ids)
-            conn.execute(f"DELETE FROM seen_urls WHERE article_id IN ({placeholders})", article_ids)
-            conn.commit()
+            conn.execute("DELETE FROM images WHERE article_id IN (SELECT id FROM prune_ids)")
+            conn.execute("DELETE FROM articles WHERE id IN (SELECT id FROM prune_ids)")
+            conn.execute("DELETE FROM seen_urls WHERE article_id IN (SELECT id FROM prune_ids)")
+        
+        # Delete images from disk in parallel, outside the write lock
+        # (I/O bound; rmtree ignores directories that do not exist)
+        img_root = Path("data/images")
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            list(pool.map(
+                lambda article_id: shutil.rmtree(img_root / article_id, ignore_errors=True),
+                article_ids
+            ))
         
         print(f"[Storage] Pruned {len(article_ids)} old discarded articles")
         return len(article_ids)
@@ -712,11 +1220,14 @@ class Storage:
 
 # === Singleton ===
 _storage: Optional[Storage] = None
+_storage_lock = threading.Lock()
 
 def get_storage() -> Storage:
     global _storage
     if _storage is None:
-        _storage = Storage()
+        with _storage_lock:
+            if _storage is None:
+                _storage = Storage()
     return _storage
 
 
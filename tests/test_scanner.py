@@ -0,0 +1,100 @@
+"""Scanner tests (run from the repo root: python -m unittest discover tests)."""
+
+import tempfile
+import unittest
+
+from aiohttp import web
+
+import scanner
+from config import SourceConfig, get_config
+from scanner import Scanner, _XmlStream, close_shared_session
+
+_URLSET = b'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+
+
+def _parse(xml: bytes, chunk_size: int):
+    stream = _XmlStream(Scanner(SourceConfig(name='T', url='https://x.vn/sitemap.xml')))
+    for i in range(0, len(xml), chunk_size):
+        stream.feed(xml[i:i + chunk_size])
+    return [(a.url, a.published) for a in stream.close()]
+
+
+class XmlStreamTest(unittest.TestCase):
+    CHUNK_SIZES = (7, 100, 1 << 20)
+    
+    def assertParsed(self, xml: bytes, expected):
+        for chunk_size in self.CHUNK_SIZES:
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(_parse(xml, chunk_size), expected)
+    
+    def test_plain_sitemap(self):
+        xml = _URLSET + b''.join(
+            b'<url><loc>https://x.vn/p-%d.html</loc><lastmod>L%d</lastmod></url>' % (i, i)
+            for i in range(300)
+        ) + b'</urlset>'
+        self.assertParsed(xml, [(f'https://x.vn/p-{i}.html', f'L{i}') for i in range(300)])
+    
+    def test_mixed_cdata_after_plain_first_url(self):
+        xml = _URLSET + b'<url><loc>https://x.vn/c-0.html</loc></url>' + b''.join(
+            b'<url><loc><![CDATA[https://x.vn/c-%d.html]]></loc></url>' % i for i in range(1, 50)
+        ) + b'</urlset>'
+        self.assertParsed(xml, [(f'https://x.vn/c-{i}.html', None) for i in range(50)])
+    
+    def test_mixed_lastmod_before_loc(self):
+        xml = _URLSET + b''.join(
+            b'<url><loc>https://x.vn/m-%d.html</loc><lastmod>L%d</lastmod></url>' % (i, i)
+            for i in range(40)
+        ) + b''.join(
+            b'<url><lastmod>L%d</lastmod><loc>https://x.vn/m-%d.html</loc></url>' % (i, i)
+            for i in range(40, 50)
+        ) + b'</urlset>'
+        self.assertParsed(xml, [(f'https://x.vn/m-{i}.html', f'L{i}') for i in range(50)])
+    
+    def test_rss(self):
+        xml = b'<rss><channel>' + b''.join(
+            b'<item><link><![CDATA[https://x.vn/r-%d.html]]></link><title>T</title></item>' % i
+            for i in range(20)
+        ) + b'</channel></rss>'
+        self.assertParsed(xml, [(f'https://x.vn/r-{i}.html', None) for i in range(20)])
+
+
+class UnchangedBodyTest(unittest.IsolatedAsyncioTestCase):
+    """A byte-identical 200 (no validators) yields no articles, on every path."""
+    RSS = b'<rss><channel><item><link>https://x.vn/a-185260107154311932.htm</link></item></channel></rss>'
+    HTML = b'<html><body><h3><a href="/b-123.html">B</a></h3></body></html>'
+    
+    async def asyncSetUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        config = get_config()
+        self._old_path = config.storage.path
+        config.storage.path = self._tmp.name  # validators are persisted here
+        
+        app = web.Application()
+        app.router.add_get('/rss', lambda request: web.Response(body=self.RSS, content_type='application/xml'))
+        app.router.add_get('/html', lambda request: web.Response(body=self.HTML, content_type='text/html'))
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        self.base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+    
+    async def asyncTearDown(self):
+        await close_shared_session()
+        await self._runner.cleanup()
+        scanner._save_validators()
+        get_config().storage.path = self._old_path
+        self._tmp.cleanup()
+    
+    async def test_xml_unchanged_body(self):
+        s = Scanner(SourceConfig(name='T', url=f'{self.base}/rss'))
+        self.assertEqual(len(await s._scan_xml()), 1)
+        self.assertEqual(len(await s._scan_xml()), 0)
+    
+    async def test_html_unchanged_body(self):
+        s = Scanner(SourceConfig(name='T', url=f'{self.base}/html'))
+        self.assertEqual([a.url for a in await s._scan_html()], [f'{self.base}/b-123.html'])
+        self.assertEqual(len(await s._scan_html()), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
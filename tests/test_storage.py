@@ -0,0 +1,70 @@
+"""Storage tests (run from the repo root: python -m unittest discover tests)."""
+
+import tempfile
+import unittest
+
+from config import get_config
+from storage import Article, Storage, _UrlBloom
+
+
+def _article(n: int, title: str = "title", source_name: str = "S") -> Article:
+    return Article(
+        id=f"id-{n}", source="s", source_name=source_name, url=f"https://x.vn/a-{n}.html",
+        title=title, sapo="", author="", content_text="body", content_html="",
+        images=[], published_at="", crawled_at="2026-01-01T00:00:00",
+    )
+
+
+class CheckpointTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        config = get_config()
+        self._old_path = config.storage.path
+        config.storage.path = self._tmp.name
+        self.storage = Storage()
+    
+    def tearDown(self):
+        self.storage.close()
+        get_config().storage.path = self._old_path
+        self._tmp.cleanup()
+    
+    def test_bulk_save_counts_only_new_urls(self):
+        self.assertEqual(self.storage.save_articles_bulk([_article(1), _article(2)]), [True, True])
+        
+        # Re-save of a seen URL, an in-batch duplicate and a NOT NULL failure
+        results = self.storage.save_articles_bulk(
+            [_article(2), _article(3), _article(3), _article(4, title=None)]
+        )
+        self.assertEqual(results, [True, True, True, False])
+        
+        state = self.storage.get_checkpoint("S")
+        self.assertEqual(state.articles_count, 3)
+        self.assertEqual(state.last_article_id, "id-3")
+        self.assertEqual(state.last_article_url, "https://x.vn/a-3.html")
+    
+    def test_checkpoint_per_source(self):
+        self.storage.save_articles_bulk([_article(1, source_name="A"), _article(2, source_name="B")])
+        self.assertEqual(self.storage.get_checkpoint("A").last_article_id, "id-1")
+        self.assertEqual(self.storage.get_checkpoint("B").last_article_id, "id-2")
+        self.assertIsNone(self.storage.get_checkpoint("C"))
+
+
+class UrlBloomTest(unittest.TestCase):
+    def test_readd_does_not_count(self):
+        bloom = _UrlBloom(100)
+        for _ in range(3):
+            bloom.add(12345678901234)
+        self.assertEqual(bloom.count, 1)
+        self.assertIn(12345678901234, bloom)
+    
+    def test_distinct_hashes_count(self):
+        bloom = _UrlBloom(1000)
+        hashes = [(n * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF for n in range(1, 101)]
+        for url_hash in hashes:
+            bloom.add(url_hash)
+        self.assertEqual(bloom.count, 100)
+        self.assertTrue(all(url_hash in bloom for url_hash in hashes))
+
+
+if __name__ == "__main__":
+    unittest.main()